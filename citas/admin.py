@@ -1,17 +1,198 @@
+from datetime import timedelta
+
 from django.contrib import admin
-from .models import Cliente, Cita
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import Cliente, Cita, OcupacionFranja, PosibleDuplicado, SerieCita, Tarea
+from .resumen import invalidar_resumen
+
+
+class PaginadorAproximado(Paginator):
+    """
+    Evita el COUNT(*) completo en tablas grandes: cuenta solo hasta una
+    fila después de la página siguiente a `pagina` (al menos
+    LIMITE_CONTEO). Si el conteo se corta, `aproximado` queda en True y
+    siempre hay una página más para seguir avanzando; sin filtros en
+    PostgreSQL se usa además la estimación de pg_class.reltuples si es
+    mayor que el conteo cortado.
+    """
+
+    LIMITE_CONTEO = 10000
+
+    def __init__(self, *args, pagina=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pagina = pagina
+        self.aproximado = False
+
+    def _estimacion(self, consulta):
+        """Filas estimadas por PostgreSQL para la tabla completa, o 0."""
+        conexion = connections[consulta.db]
+        if consulta.query.where or conexion.vendor != "postgresql":
+            return 0
+        with conexion.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [consulta.model._meta.db_table],
+            )
+            fila = cursor.fetchone()
+        return max(fila[0], 0) if fila else 0
+
+    @cached_property
+    def count(self):
+        consulta = self.object_list
+        limite = max(self.LIMITE_CONTEO, (self.pagina + 1) * self.per_page + 1)
+        total = consulta.order_by()[:limite].count()
+        self.aproximado = total == limite
+        if self.aproximado:
+            # La estimación puede estar desactualizada: nunca baja del conteo real
+            total = max(total, self._estimacion(consulta))
+        return total
+
+
+class PaginacionAproximadaMixin:
+    """Usa PaginadorAproximado indicándole la página pedida en el changelist."""
+
+    paginator = PaginadorAproximado
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        try:
+            pagina = max(int(request.GET.get(PAGE_VAR, 1)), 1)
+        except ValueError:
+            pagina = 1
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page, pagina=pagina
+        )
+
+
+class BusquedaPorPrefijoMixin:
+    """Búsqueda por prefijo indexado (ClienteQuerySet.buscar) en lugar de icontains."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return self.buscar(queryset, search_term), False
 
 
 @admin.register(Cliente)
-class ClienteAdmin(admin.ModelAdmin):
-    list_display = ("nombre", "telefono", "email", "activo", "creado")
-    search_fields = ("nombre", "telefono", "email")
+class ClienteAdmin(PaginacionAproximadaMixin, BusquedaPorPrefijoMixin, admin.ModelAdmin):
+    list_display = ("nombre", "telefono", "email", "activo", "total_citas", "creado")
+    search_fields = ("nombre", "telefono")
+    search_help_text = "Inicio del nombre o del teléfono."
     list_filter = ("activo",)
 
+    def buscar(self, queryset, texto):
+        return queryset.buscar(texto, limite=None)
+
+
+class PeriodoFilter(admin.SimpleListFilter):
+    """Rangos de fecha fijos; cada uno es un rango sobre el índice de fecha."""
+
+    title = "periodo"
+    parameter_name = "periodo"
+
+    def lookups(self, request, model_admin):
+        return [
+            ("hoy", "Hoy"),
+            ("semana", "Próximos 7 días"),
+            ("mes", "Próximos 30 días"),
+            ("pasadas_30", "Últimos 30 días"),
+            ("pasadas", "Pasadas"),
+        ]
+
+    def queryset(self, request, queryset):
+        hoy = timezone.localdate()
+        rangos = {
+            "hoy": {"fecha": hoy},
+            "semana": {"fecha__gte": hoy, "fecha__lte": hoy + timedelta(days=7)},
+            "mes": {"fecha__gte": hoy, "fecha__lte": hoy + timedelta(days=30)},
+            "pasadas_30": {"fecha__gte": hoy - timedelta(days=30), "fecha__lt": hoy},
+            "pasadas": {"fecha__lt": hoy},
+        }
+        if self.value() in rangos:
+            return queryset.filter(**rangos[self.value()])
+        return queryset
+
 
 @admin.register(Cita)
-class CitaAdmin(admin.ModelAdmin):
+class CitaAdmin(PaginacionAproximadaMixin, BusquedaPorPrefijoMixin, admin.ModelAdmin):
     list_display = ("cliente", "fecha", "hora", "motivo", "estado", "asistio")
+    list_select_related = ("cliente",)
+    search_fields = ("cliente__nombre",)
+    search_help_text = "Inicio del nombre o del teléfono del cliente."
+    # estado, periodo y asistio se resuelven con cita_estado_fecha_idx,
+    # cita_fecha_hora_idx y cita_asistio_fecha_idx
+    list_filter = ("estado", PeriodoFilter, "asistio")
+    autocomplete_fields = ("cliente",)
+    actions = ("marcar_confirmadas", "cancelar_citas", "invalidar_enlaces")
+
+    def buscar(self, queryset, texto):
+        return queryset.filter(cliente__in=Cliente.objects.buscar(texto, limite=None).values("pk"))
+
+    def delete_model(self, request, obj):
+        # Cita.delete libera la franja y descuenta los contadores del cliente
+        obj.delete()
+
+    def delete_queryset(self, request, queryset):
+        # "Eliminar seleccionados" usaría QuerySet.delete(), que no pasa por Cita.delete
+        queryset.eliminar()
+        invalidar_resumen()
+
+    def _cambiar_estado(self, request, queryset, estado, descripcion):
+        total = queryset.cambiar_estado(estado)
+        invalidar_resumen()
+        self.message_user(request, f"{total} cita(s) {descripcion}.")
+
+    @admin.action(description="Marcar como confirmadas")
+    def marcar_confirmadas(self, request, queryset):
+        self._cambiar_estado(request, queryset, "confirmada", "confirmada(s)")
+
+    @admin.action(description="Cancelar citas seleccionadas")
+    def cancelar_citas(self, request, queryset):
+        self._cambiar_estado(request, queryset, "cancelada", "cancelada(s)")
+
+    @admin.action(description="Invalidar enlaces de confirmación enviados")
+    def invalidar_enlaces(self, request, queryset):
+        total = queryset.rotar_tokens()
+        self.message_user(
+            request,
+            f"Enlaces de {total} cita(s) invalidados. Envía el recordatorio de nuevo.",
+        )
+
+
+@admin.register(SerieCita)
+class SerieCitaAdmin(admin.ModelAdmin):
+    list_display = ("cliente", "hora", "intervalo", "unidad", "fecha_inicio", "fecha_fin", "repeticiones")
+    list_select_related = ("cliente",)
+    autocomplete_fields = ("cliente",)
     search_fields = ("cliente__nombre", "motivo")
-    list_filter = ("estado", "asistio", "fecha")
+    list_filter = ("unidad",)
+
+
+@admin.register(OcupacionFranja)
+class OcupacionFranjaAdmin(admin.ModelAdmin):
+    list_display = ("fecha", "hora", "ocupadas", "capacidad")
+    list_editable = ("capacidad",)
+    list_filter = ("fecha",)
+    readonly_fields = ("ocupadas",)
     date_hierarchy = "fecha"
+
+
+@admin.register(PosibleDuplicado)
+class PosibleDuplicadoAdmin(admin.ModelAdmin):
+    list_display = ("cliente", "duplicado", "puntaje", "motivos", "estado", "creado")
+    list_filter = ("estado",)
+    list_select_related = ("cliente", "duplicado")
+    autocomplete_fields = ("cliente", "duplicado")
+    readonly_fields = ("puntaje", "motivos", "creado", "revisado")
+
+
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ("nombre", "estado", "progreso", "intentos", "usuario", "creado")
+    list_filter = ("estado", "nombre")
+    readonly_fields = ("resultado", "error", "iniciado", "terminado")
@@ -0,0 +1,96 @@
+"""
+Ocupación del consultorio por día de la semana × hora.
+
+Una sola consulta GROUP BY por rango de fechas; el resultado se guarda en
+la caché por (rango, estado).
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .funciones import DiaSemana, Hora
+from .models import Cita
+
+# Rangos que incluyen hoy cambian a lo largo del día; los pasados no
+OCUPACION_CACHE_TTL = 600
+OCUPACION_CACHE_TTL_HISTORICO = 24 * 3600
+
+# Orden de presentación (lunes primero) sobre la numeración 1=domingo…7=sábado
+DIAS_SEMANA = [
+    (2, "Lunes"),
+    (3, "Martes"),
+    (4, "Miércoles"),
+    (5, "Jueves"),
+    (6, "Viernes"),
+    (7, "Sábado"),
+    (1, "Domingo"),
+]
+
+
+def ocupacion(fecha_inicio, fecha_fin, estado=""):
+    """
+    Lista de franjas con citas: dia_semana, hora, total, asistidas,
+    no_asistidas y canceladas.
+    """
+    clave = f"analitica:ocupacion:{fecha_inicio.isoformat()}:{fecha_fin.isoformat()}:{estado or 'todos'}"
+    franjas = cache.get(clave)
+    if franjas is not None:
+        return franjas
+
+    citas = Cita.objects.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+    if estado:
+        citas = citas.filter(estado=estado)
+    franjas = list(
+        citas.order_by()
+        .annotate(dia_semana=DiaSemana("fecha"), hora_dia=Hora("hora"))
+        .values("dia_semana", "hora_dia")
+        .annotate(
+            total=Count("pk"),
+            asistidas=Count("pk", filter=Q(asistio=True)),
+            no_asistidas=Count("pk", filter=Q(asistio=False)),
+            canceladas=Count("pk", filter=Q(estado="cancelada")),
+        )
+    )
+
+    historico = fecha_fin < timezone.localdate()
+    cache.set(clave, franjas, OCUPACION_CACHE_TTL_HISTORICO if historico else OCUPACION_CACHE_TTL)
+    return franjas
+
+
+def matriz_ocupacion(franjas, horas, metrica="total"):
+    """
+    Tabla para el mapa de calor: una fila por día con una celda por hora.
+    Cada celda trae sus conteos, la tasa de asistencia y una intensidad 0-1
+    relativa al máximo de la métrica elegida.
+    """
+    por_franja = {(f["dia_semana"], f["hora_dia"]): f for f in franjas}
+
+    def valor(franja):
+        if metrica == "tasa_asistencia":
+            return _tasa_asistencia(franja) or 0
+        return franja[metrica]
+
+    maximo = max((valor(f) for f in franjas), default=0) or 1
+    filas = []
+    for dia, nombre in DIAS_SEMANA:
+        celdas = []
+        for hora in horas:
+            franja = por_franja.get(
+                (dia, hora),
+                {"total": 0, "asistidas": 0, "no_asistidas": 0, "canceladas": 0},
+            )
+            celdas.append({
+                **franja,
+                "hora": hora,
+                "tasa_asistencia": _tasa_asistencia(franja),
+                "intensidad": round(valor(franja) / maximo, 2) if franja["total"] else 0,
+            })
+        filas.append({"dia": nombre, "celdas": celdas})
+    return filas
+
+
+def _tasa_asistencia(franja):
+    registradas = franja["asistidas"] + franja["no_asistidas"]
+    if not registradas:
+        return None
+    return round(franja["asistidas"] / registradas * 100, 1)
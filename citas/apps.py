@@ -5,3 +5,14 @@ class CitasConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "citas"
     verbose_name = "Sistema de Citas"
+
+    def ready(self):
+        # Registra las señales que invalidan la caché de usuarios y del dashboard
+        from . import autenticacion, resumen  # noqa: F401
+
+        from django.conf import settings
+
+        if settings.CALENTAR_AL_INICIAR:
+            from .arranque import calentar
+
+            calentar()
@@ -0,0 +1,52 @@
+"""
+Calentamiento de workers.
+
+Se ejecuta desde `CitasConfig.ready()` cuando CALENTAR_AL_INICIAR está
+activo (gunicorn lo activa en gunicorn.conf.py). Con `--preload` corre una
+sola vez en el proceso maestro y los workers heredan el resultado al
+hacer fork.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _plantillas_citas():
+    for directorio in settings.TEMPLATES[0]["DIRS"]:
+        base = directorio / "citas"
+        for ruta in sorted(base.rglob("*.html")):
+            yield ruta.relative_to(directorio).as_posix()
+
+
+def calentar():
+    """Precompila plantillas, resuelve las URLs y llena la caché del dashboard."""
+    inicio = time.perf_counter()
+    try:
+        plantillas = 0
+        for nombre in _plantillas_citas():
+            get_template(nombre)
+            plantillas += 1
+
+        resolver = get_resolver()
+        resolver.reverse_dict  # fuerza la carga de todos los patrones
+
+        from .resumen import resumen_dashboard
+
+        resumen_dashboard()
+    except Exception:
+        # Sin migraciones o sin base de datos el servidor debe arrancar igual
+        logger.warning("No se pudo completar el calentamiento", exc_info=True)
+        return
+    finally:
+        # No heredar conexiones abiertas en el maestro a los workers
+        connections.close_all()
+
+    logger.info(
+        "Calentamiento: %d plantillas en %.0f ms", plantillas, (time.perf_counter() - inicio) * 1000
+    )
@@ -0,0 +1,72 @@
+"""
+Caché de usuarios autenticados.
+
+`AuthenticationMiddleware` consulta `auth_user` en cada petición para
+reconstruir `request.user`. Este backend guarda el usuario en la caché
+compartida y las señales de abajo lo invalidan cuando cambian su
+contraseña, sus permisos o sus grupos.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+Usuario = get_user_model()
+
+
+def clave_usuario(user_id):
+    return f"auth:usuario:{user_id}"
+
+
+def invalidar_usuarios(*user_ids):
+    cache.delete_many([clave_usuario(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend que sirve `get_user` desde la caché."""
+
+    def get_user(self, user_id):
+        clave = clave_usuario(user_id)
+        usuario = cache.get(clave)
+        if usuario is None:
+            usuario = super().get_user(user_id)
+            if usuario is not None:
+                cache.set(clave, usuario, settings.AUTH_USER_CACHE_TIMEOUT)
+        return usuario
+
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def _usuario_modificado(sender, instance, **kwargs):
+    """Cubre cambios de contraseña, is_active/is_staff y último acceso."""
+    invalidar_usuarios(instance.pk)
+
+
+@receiver(m2m_changed, sender=Usuario.groups.through)
+@receiver(m2m_changed, sender=Usuario.user_permissions.through)
+def _permisos_usuario_modificados(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidar_usuarios(instance.pk)
+    elif pk_set:
+        invalidar_usuarios(*pk_set)
+    else:
+        # post_clear desde el lado del grupo/permiso: no se conocen los usuarios
+        invalidar_usuarios(*Usuario.objects.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def _permisos_grupo_modificados(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        usuarios = Usuario.objects.filter(groups=instance)
+    elif pk_set:
+        usuarios = Usuario.objects.filter(groups__pk__in=pk_set)
+    else:
+        usuarios = Usuario.objects.all()
+    invalidar_usuarios(*usuarios.values_list("pk", flat=True).distinct())
@@ -0,0 +1,105 @@
+"""
+GET condicional (ETag) para las páginas HTML de listas y detalles.
+
+Cada vista declara un sondeo barato (máximo de `actualizado` y conteo de las
+filas que muestra). El ETag combina ese sondeo con el usuario, la cookie
+CSRF y una ventana de tiempo (las páginas muestran citas "pasadas" según la
+hora). Si el navegador envía el mismo ETag se responde 304 sin ejecutar la
+vista ni la plantilla. Con mensajes pendientes nunca se responde 304, para
+no perderlos.
+
+Los procesos que modifican filas sin tocar `actualizado` (por ejemplo el
+cálculo de riesgo con bulk_update) llaman a `invalidar(nombre)` y las vistas
+afectadas incluyen `version(nombre)` en su sondeo.
+
+No se envía Last-Modified: una fecha no refleja eliminaciones ni el estado
+de la sesión.
+"""
+import hashlib
+import logging
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+logger = logging.getLogger(__name__)
+
+VENTANA_ETAG_SEGUNDOS = 300
+# Cada cuántas respuestas condicionales se escribe el resumen en el log
+RESUMEN_CADA = 50
+
+_respuestas = Counter()
+
+
+def invalidar(nombre):
+    """Cambia la versión `nombre` para que los ETag que la incluyen dejen de coincidir."""
+    cache.set(f"etag:version:{nombre}", time.time_ns(), None)
+
+
+def version(nombre):
+    return cache.get(f"etag:version:{nombre}")
+
+
+def sondeo(queryset):
+    """(máximo de `actualizado`, conteo) de un queryset en una sola consulta."""
+    datos = queryset.order_by().aggregate(m=Max("actualizado"), n=Count("pk"))
+    return (datos["m"], datos["n"])
+
+
+def _registrar(nombre, acierto):
+    _respuestas["total"] += 1
+    _respuestas[nombre, acierto] += 1
+    if acierto:
+        _respuestas["aciertos"] += 1
+    logger.debug("%s: %s", nombre, "304" if acierto else "200")
+    if _respuestas["total"] % RESUMEN_CADA == 0:
+        logger.info(
+            "GET condicional: %d de %d respuestas fueron 304 (%.0f%%)",
+            _respuestas["aciertos"],
+            _respuestas["total"],
+            100 * _respuestas["aciertos"] / _respuestas["total"],
+        )
+
+
+def estadisticas():
+    """Conteos acumulados en este proceso."""
+    return dict(_respuestas)
+
+
+def etag_condicional(funcion_sondeo):
+    """
+    Decorador para vistas GET. `funcion_sondeo(request, *args, **kwargs)`
+    devuelve una tupla con los datos que, al cambiar, cambian la página.
+    """
+
+    def decorador(vista):
+        def calcular_etag(request, *args, **kwargs):
+            if len(messages.get_messages(request)):
+                return None
+            partes = (
+                request.user.pk,
+                request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+                int(time.time() // VENTANA_ETAG_SEGUNDOS),
+                *funcion_sondeo(request, *args, **kwargs),
+            )
+            return hashlib.blake2b(repr(partes).encode(), digest_size=16).hexdigest()
+
+        vista_condicional = condition(etag_func=calcular_etag)(vista)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            respuesta = vista_condicional(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD") and respuesta.has_header("ETag"):
+                patch_cache_control(respuesta, private=True, no_cache=True)
+                _registrar(vista.__name__, respuesta.status_code == 304)
+            return respuesta
+
+        return envoltura
+
+    return decorador
@@ -0,0 +1,22 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+
+
+def login_required_async(vista):
+    """
+    Equivalente de `login_required` para vistas async.
+
+    En Django 4.2 `login_required` no acepta corrutinas y `request.user`
+    consulta la base de forma síncrona, así que se resuelve en un hilo.
+    """
+
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        autenticado = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not autenticado:
+            return redirect_to_login(request.get_full_path())
+        return await vista(request, *args, **kwargs)
+
+    return envoltura
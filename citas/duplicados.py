@@ -0,0 +1,184 @@
+"""
+Detección y fusión de clientes duplicados.
+
+Comparar todos los pares es cuadrático, así que los clientes se agrupan en
+bloques por claves baratas (últimos 7 dígitos del teléfono y una clave
+fonética de nombre + apellido) y solo se califican los pares que comparten
+algún bloque. Los pares con puntaje suficiente se guardan en
+PosibleDuplicado para revisión manual.
+"""
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Cita, Cliente, PosibleDuplicado, SerieCita
+from .resumen import invalidar_resumen
+
+UMBRAL_PUNTAJE = 0.75
+PESO_NOMBRE = 0.6
+PESO_TELEFONO = 0.4
+BONO_EMAIL = 0.2
+DIGITOS_BLOQUE = 7
+# Bloques más grandes (nombres muy comunes) se omiten: no aportan señal
+TAMANO_MAXIMO_BLOQUE = 40
+
+PARTICULAS = {"de", "del", "la", "las", "los", "y"}
+
+# Equivalencias fonéticas del español, en orden de aplicación
+_FONETICA = [
+    (re.compile(r"ll"), "y"),
+    (re.compile(r"ch"), "x"),
+    (re.compile(r"qu"), "k"),
+    (re.compile(r"c(?=[ei])"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"g(?=[ei])"), "j"),
+    (re.compile(r"gu(?=[ei])"), "g"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"[vw]"), "b"),
+    (re.compile(r"h"), ""),
+    (re.compile(r"y(?![aeiou])"), "i"),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+
+
+def clave_fonetica(palabra):
+    """Clave aproximada de pronunciación: 'Gonzalez' y 'Gonsales' coinciden."""
+    for patron, reemplazo in _FONETICA:
+        palabra = patron.sub(reemplazo, palabra)
+    return palabra
+
+
+def _fonetica_nombre(nombre_normalizado):
+    """Claves fonéticas de las palabras del nombre, sin partículas."""
+    return tuple(
+        clave_fonetica(p) for p in nombre_normalizado.split() if p not in PARTICULAS
+    )
+
+
+def _claves_nombre(fonetica):
+    if len(fonetica) < 2:
+        return set()
+    # nombre + primer apellido y nombre + último apellido
+    return {f"n:{fonetica[0]}|{fonetica[1]}", f"n:{fonetica[0]}|{fonetica[-1]}"}
+
+
+def _similitud(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _puntaje(a, b):
+    """Similitud (0-1) de dos clientes y las coincidencias que la explican."""
+    fonetica_a, telefono_a, email_a = a
+    fonetica_b, telefono_b, email_b = b
+    if len(fonetica_a) < 2 or len(fonetica_b) < 2:
+        similitud_nombre = _similitud(" ".join(fonetica_a), " ".join(fonetica_b))
+    elif _claves_nombre(fonetica_a) & _claves_nombre(fonetica_b):
+        similitud_nombre = 1.0
+    else:
+        # Producto: familiares con los mismos apellidos no se parecen en el nombre
+        similitud_nombre = _similitud(fonetica_a[0], fonetica_b[0]) * _similitud(
+            " ".join(fonetica_a[1:]), " ".join(fonetica_b[1:])
+        )
+
+    if telefono_a and telefono_a == telefono_b:
+        similitud_telefono = 1.0
+    elif len(telefono_a) >= 10 and telefono_a[-10:] == telefono_b[-10:]:
+        similitud_telefono = 0.95
+    elif telefono_a and telefono_a[-DIGITOS_BLOQUE:] == telefono_b[-DIGITOS_BLOQUE:]:
+        similitud_telefono = 0.6
+    else:
+        similitud_telefono = 0.0
+
+    puntaje = PESO_NOMBRE * similitud_nombre + PESO_TELEFONO * similitud_telefono
+    motivos = []
+    if similitud_nombre >= 0.8:
+        motivos.append("nombre")
+    if similitud_telefono >= 0.6:
+        motivos.append("teléfono")
+    if email_a and email_a == email_b:
+        puntaje += BONO_EMAIL
+        motivos.append("email")
+    return min(puntaje, 1.0), motivos
+
+
+def pares_candidatos(clientes):
+    """
+    Pares (pk menor, pk mayor) que comparten algún bloque. `clientes` es un
+    dict pk → (claves fonéticas del nombre, teléfono normalizado, email).
+    """
+    bloques = defaultdict(list)
+    for pk, (fonetica, telefono, _) in clientes.items():
+        if len(telefono) >= DIGITOS_BLOQUE:
+            bloques[f"t:{telefono[-DIGITOS_BLOQUE:]}"].append(pk)
+        for clave in _claves_nombre(fonetica):
+            bloques[clave].append(pk)
+
+    pares = set()
+    for miembros in bloques.values():
+        if 1 < len(miembros) <= TAMANO_MAXIMO_BLOQUE:
+            pares.update(combinations(sorted(miembros), 2))
+    return pares
+
+
+def buscar_duplicados(umbral=UMBRAL_PUNTAJE):
+    """
+    Recalcula la lista de revisión. Los pares ya descartados o fusionados
+    no se vuelven a proponer. Retorna (pares_comparados, pares_guardados).
+    """
+    clientes = {
+        pk: (_fonetica_nombre(nombre), telefono, (email or "").lower())
+        for pk, nombre, telefono, email in Cliente.objects.vigentes()
+        .filter(activo=True)
+        .order_by()
+        .values_list("pk", "nombre_busqueda", "telefono_normalizado", "email")
+        .iterator(chunk_size=5000)
+    }
+    pares = pares_candidatos(clientes)
+
+    encontrados = []
+    for pk_a, pk_b in pares:
+        puntaje, motivos = _puntaje(clientes[pk_a], clientes[pk_b])
+        if puntaje >= umbral:
+            encontrados.append(
+                PosibleDuplicado(
+                    cliente_id=pk_a,
+                    duplicado_id=pk_b,
+                    puntaje=round(puntaje, 3),
+                    motivos=", ".join(motivos),
+                )
+            )
+
+    with transaction.atomic():
+        PosibleDuplicado.objects.filter(estado="pendiente").delete()
+        PosibleDuplicado.objects.bulk_create(encontrados, batch_size=500, ignore_conflicts=True)
+    return len(pares), len(encontrados)
+
+
+def fusionar(cliente, duplicado):
+    """
+    Pasa las citas y series de `duplicado` a `cliente` (un UPDATE cada una),
+    desactiva el duplicado y recalcula los contadores de ambos.
+    Retorna el número de citas movidas.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        citas = Cita.objects.filter(cliente=duplicado).update(
+            cliente=cliente, actualizado=ahora
+        )
+        SerieCita.objects.filter(cliente=duplicado).update(cliente=cliente)
+        Cliente.objects.filter(pk=duplicado.pk).update(activo=False, actualizado=ahora)
+        Cliente.objects.filter(pk__in=[cliente.pk, duplicado.pk]).recalcular_contadores()
+
+        par = Q(cliente=cliente, duplicado=duplicado) | Q(cliente=duplicado, duplicado=cliente)
+        PosibleDuplicado.objects.filter(par).update(estado="fusionado", revisado=ahora)
+        # Los demás pares del duplicado se volverán a detectar contra `cliente`
+        PosibleDuplicado.objects.filter(
+            Q(cliente=duplicado) | Q(duplicado=duplicado), estado="pendiente"
+        ).delete()
+    invalidar_resumen()
+    return citas
@@ -0,0 +1,66 @@
+"""
+Enlaces cortos de confirmación.
+
+El token tiene la forma `<pk>-<vence>-<firma>`: pk y fecha de vencimiento
+en base 36 y una firma HMAC-SHA256 truncada. La firma también cubre el
+`token_confirmacion` de la cita, así que regenerarlo invalida tanto los
+enlaces cortos como los UUID anteriores: lo hacen Cita.save y
+CitaQuerySet.desplazar cuando cambia la fecha, y la acción "Invalidar
+enlaces" del admin (`CitaQuerySet.rotar_tokens`). Se aceptan firmas
+hechas con SECRET_KEY o con cualquiera de SECRET_KEY_FALLBACKS.
+"""
+import base64
+from datetime import date
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+SAL_CONFIRMACION = "citas.enlaces.confirmacion"
+LONGITUD_FIRMA = 12  # 72 bits
+_EPOCA = date(2020, 1, 1).toordinal()
+# Mayor llave primaria posible (BigAutoField)
+PK_MAXIMO = 2**63 - 1
+
+
+class TokenInvalido(Exception):
+    """El token no tiene el formato esperado."""
+
+
+def _firma(pk, vence, token_confirmacion, secreto=None):
+    valor = f"{pk}:{vence}:{token_confirmacion.hex}"
+    digest = salted_hmac(SAL_CONFIRMACION, valor, secret=secreto, algorithm="sha256").digest()
+    return base64.urlsafe_b64encode(digest).decode()[:LONGITUD_FIRMA]
+
+
+def generar_token(cita, vence=None):
+    """Token corto para `cita`, válido hasta `vence` (por defecto, el día de la cita)."""
+    dias = (vence or cita.fecha).toordinal() - _EPOCA
+    firma = _firma(cita.pk, dias, cita.token_confirmacion)
+    return f"{int_to_base36(cita.pk)}-{int_to_base36(dias)}-{firma}"
+
+
+def leer_token(token):
+    """Separa un token en (pk, vence, firma) sin consultar la base de datos."""
+    try:
+        pk, dias, firma = token.split("-", 2)
+        pk, dias = base36_to_int(pk), base36_to_int(dias)
+    except ValueError:
+        raise TokenInvalido(token)
+    if pk > PK_MAXIMO or dias > date.max.toordinal() - _EPOCA:
+        raise TokenInvalido(token)
+    return pk, dias, firma
+
+
+def firma_valida(cita, vence, firma):
+    """Comprueba la firma contra la clave actual y las anteriores."""
+    secretos = [settings.SECRET_KEY, *settings.SECRET_KEY_FALLBACKS]
+    return any(
+        constant_time_compare(firma, _firma(cita.pk, vence, cita.token_confirmacion, secreto))
+        for secreto in secretos
+    )
+
+
+def vencido(vence):
+    return date.fromordinal(_EPOCA + vence) < timezone.localdate()
@@ -0,0 +1,133 @@
+"""
+Flujo de cambios de citas para el dashboard y la lista (server-sent events).
+
+No hay una tabla de eventos aparte: toda modificación de una cita, incluidas
+las masivas con UPDATE, actualiza `actualizado`, así que cada conexión
+consulta periódicamente las citas con `actualizado` posterior a su cursor
+(índice cita_actualizado_idx). El cursor viaja como id del evento, y el
+navegador lo reenvía en `Last-Event-ID` al reconectar, así que no se pierden
+cambios entre conexiones.
+
+Las filas más recientes que RETRASO_SEGUNDOS se leen en la siguiente vuelta,
+para no saltarse una transacción que fijó `actualizado` antes que otra pero
+confirmó después. Las citas borradas no generan eventos.
+
+En modo ASGI la conexión queda abierta (consulta cada INTERVALO_SEGUNDOS)
+y se cierra tras DURACION_SEGUNDOS. Los workers WSGI son síncronos y una
+conexión abierta bloquearía un worker completo, así que ahí cada conexión
+envía los cambios pendientes y se cierra; el navegador reconecta solo tras
+REINTENTO_WSGI_MS.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .models import Cita
+from .resumen import resumen_dashboard
+
+INTERVALO_SEGUNDOS = 2
+LATIDO_SEGUNDOS = 15
+DURACION_SEGUNDOS = 300
+RETRASO_SEGUNDOS = 1
+MAXIMO_POR_CONSULTA = 200
+# Milisegundos que espera el navegador antes de reconectar
+REINTENTO_MS = 3000
+REINTENTO_WSGI_MS = 5000
+
+
+def codificar_cursor(momento, pk):
+    microsegundos = int(momento.timestamp() * 1_000_000)
+    return f"{microsegundos}-{pk}"
+
+
+def leer_cursor(texto):
+    """(momento, pk) de un Last-Event-ID, o None si no es válido."""
+    try:
+        microsegundos, pk = (int(parte) for parte in texto.split("-"))
+        momento = datetime.fromtimestamp(microsegundos / 1_000_000, tz=dt_timezone.utc)
+    except (AttributeError, ValueError, OverflowError, OSError):
+        return None
+    return momento, pk
+
+
+def cursor_actual():
+    """Cursor para una conexión nueva: solo se envían cambios a partir de ahora."""
+    return timezone.now() - timedelta(seconds=RETRASO_SEGUNDOS), 0
+
+
+def cambios_desde(cursor):
+    """Citas modificadas después de `cursor`, en orden, y el nuevo cursor."""
+    momento, pk = cursor
+    hasta = timezone.now() - timedelta(seconds=RETRASO_SEGUNDOS)
+    filas = list(
+        Cita.objects.filter(actualizado__gte=momento, actualizado__lte=hasta)
+        .exclude(actualizado=momento, pk__lte=pk)
+        .order_by("actualizado", "pk")
+        .values("pk", "estado", "fecha", "hora", "actualizado", "cliente__nombre")[
+            :MAXIMO_POR_CONSULTA
+        ]
+    )
+    if filas:
+        cursor = (filas[-1]["actualizado"], filas[-1]["pk"])
+    return filas, cursor
+
+
+def _evento(tipo, datos, id_evento=None):
+    lineas = [f"event: {tipo}"]
+    if id_evento:
+        lineas.append(f"id: {id_evento}")
+    lineas.append(f"data: {json.dumps(datos, ensure_ascii=False)}")
+    return "\n".join(lineas) + "\n\n"
+
+
+def _mensajes(filas):
+    """Un evento `cita` por fila y un evento `resumen` con los contadores."""
+    estados = dict(Cita.ESTADO_CHOICES)
+    for fila in filas:
+        yield _evento(
+            "cita",
+            {
+                "id": fila["pk"],
+                "estado": fila["estado"],
+                "estado_display": estados.get(fila["estado"], fila["estado"]),
+                "fecha": fila["fecha"].isoformat(),
+                "hora": fila["hora"].strftime("%H:%M"),
+                "cliente": fila["cliente__nombre"],
+            },
+            codificar_cursor(fila["actualizado"], fila["pk"]),
+        )
+    yield _evento("resumen", resumen_dashboard())
+
+
+def _inicio(cursor, reintento_ms):
+    # Un mensaje solo con id fija Last-Event-ID sin disparar ningún evento
+    return f"retry: {reintento_ms}\nid: {codificar_cursor(*cursor)}\n\n"
+
+
+def lote(cursor):
+    """Cambios pendientes en una sola respuesta (servidores WSGI)."""
+    yield _inicio(cursor, REINTENTO_WSGI_MS)
+    filas, cursor = cambios_desde(cursor)
+    if filas:
+        yield from _mensajes(filas)
+
+
+async def flujo(cursor):
+    """Flujo continuo (servidores ASGI)."""
+    yield _inicio(cursor, REINTENTO_MS)
+    inicio = ultimo_envio = time.monotonic()
+    while time.monotonic() - inicio < DURACION_SEGUNDOS:
+        filas, cursor = await sync_to_async(cambios_desde)(cursor)
+        if filas:
+            for mensaje in await sync_to_async(lambda: list(_mensajes(filas)))():
+                yield mensaje
+            ultimo_envio = time.monotonic()
+        elif time.monotonic() - ultimo_envio >= LATIDO_SEGUNDOS:
+            yield ": latido\n\n"
+            ultimo_envio = time.monotonic()
+        if len(filas) < MAXIMO_POR_CONSULTA:
+            await asyncio.sleep(INTERVALO_SEGUNDOS)
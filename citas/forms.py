@@ -1,8 +1,12 @@
 from django import forms
 from django.utils import timezone
-from datetime import date, timedelta, time
+from datetime import date, datetime, timedelta, time
 import re
-from .models import Cliente, Cita
+from .models import (
+    Cliente, Cita, ESTADOS_ABIERTOS, FranjaLlena, OcupacionFranja, SerieCita,
+)
+from .series import conflictos, conflictos_varios
+from .widgets import ClienteAutocompleteWidget
 
 
 class ClienteForm(forms.ModelForm):
@@ -86,7 +90,7 @@ class CitaForm(forms.ModelForm):
         model = Cita
         fields = ["cliente", "fecha", "hora", "motivo", "notas"]
         widgets = {
-            "cliente": forms.Select(attrs={"class": "form-select"}),
+            "cliente": ClienteAutocompleteWidget(solo_activos=True),
             "fecha": forms.DateInput(
                 attrs={"class": "form-control", "type": "date"},
                 format="%Y-%m-%d",
@@ -208,9 +212,299 @@ class CitaForm(forms.ModelForm):
                     f"El cliente {cliente.nombre} ya tiene una cita muy cercana a esta hora. Deja al menos 30 minutos entre citas."
                 )
         
+        # El lugar en la franja lo verifica Cita.clean, que también corre en el admin
         return cleaned_data
 
 
+def _validar_hora(hora):
+    """Mismo horario de trabajo que CitaForm."""
+    if hora < CitaForm.HORA_INICIO or hora >= CitaForm.HORA_FIN:
+        raise forms.ValidationError(f"Las citas solo se pueden agendar entre {CitaForm.HORA_INICIO.strftime('%H:%M')} y {CitaForm.HORA_FIN.strftime('%H:%M')}.")
+    return hora
+
+
+def _error_conflictos(cliente, fechas):
+    listado = ", ".join(f.strftime("%d/%m/%Y") for f in fechas[:5])
+    if len(fechas) > 5:
+        listado += f" y {len(fechas) - 5} más"
+    return forms.ValidationError(
+        f"El cliente {cliente.nombre} ya tiene citas a menos de 30 minutos en: {listado}."
+    )
+
+
+class SerieCitaForm(forms.ModelForm):
+    """Formulario para crear una serie de citas recurrentes."""
+
+    class Meta:
+        model = SerieCita
+        fields = [
+            "cliente", "fecha_inicio", "hora", "motivo", "notas",
+            "intervalo", "unidad", "dia_semana", "fecha_fin", "repeticiones",
+        ]
+        widgets = {
+            "cliente": ClienteAutocompleteWidget(solo_activos=True),
+            "fecha_inicio": forms.DateInput(
+                attrs={"class": "form-control", "type": "date"}, format="%Y-%m-%d"
+            ),
+            "hora": forms.TimeInput(
+                attrs={"class": "form-control", "type": "time"}, format="%H:%M"
+            ),
+            "motivo": forms.TextInput(
+                attrs={"class": "form-control", "placeholder": "Motivo de las citas"}
+            ),
+            "notas": forms.Textarea(attrs={"class": "form-control", "rows": 2}),
+            "intervalo": forms.NumberInput(attrs={"class": "form-control", "min": 1}),
+            "unidad": forms.Select(attrs={"class": "form-select"}),
+            "dia_semana": forms.Select(attrs={"class": "form-select"}),
+            "fecha_fin": forms.DateInput(
+                attrs={"class": "form-control", "type": "date"}, format="%Y-%m-%d"
+            ),
+            "repeticiones": forms.NumberInput(attrs={"class": "form-control", "min": 1}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["cliente"].queryset = Cliente.objects.filter(activo=True)
+        self.fields["fecha_inicio"].widget.attrs["min"] = date.today().isoformat()
+        self.fields["dia_semana"].help_text = "Solo para repeticiones semanales."
+        self.fechas = []
+
+    def clean_fecha_inicio(self):
+        fecha = self.cleaned_data.get("fecha_inicio")
+        if fecha < date.today():
+            raise forms.ValidationError("No puedes crear citas en fechas pasadas.")
+        return fecha
+
+    def clean_hora(self):
+        return _validar_hora(self.cleaned_data.get("hora"))
+
+    def clean_intervalo(self):
+        intervalo = self.cleaned_data.get("intervalo")
+        if not intervalo:
+            raise forms.ValidationError("El intervalo debe ser de al menos 1.")
+        return intervalo
+
+    def clean_motivo(self):
+        motivo = self.cleaned_data.get("motivo", "").strip()
+        if len(motivo) < 5:
+            raise forms.ValidationError("El motivo debe tener al menos 5 caracteres.")
+        return motivo
+
+    def clean(self):
+        """Genera las fechas de la serie y las valida contra las citas existentes."""
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+
+        if not cleaned_data.get("fecha_fin") and not cleaned_data.get("repeticiones"):
+            raise forms.ValidationError("Indica una fecha final o un número de citas.")
+        if cleaned_data.get("dia_semana") is not None and cleaned_data["unidad"] != "semanas":
+            raise forms.ValidationError("El día de la semana solo aplica a repeticiones semanales.")
+
+        fecha_maxima = date.today() + timedelta(days=CitaForm.DIAS_MAXIMOS_FUTURO)
+        regla = SerieCita(**{
+            campo: cleaned_data.get(campo)
+            for campo in ("fecha_inicio", "intervalo", "unidad", "dia_semana", "fecha_fin", "repeticiones")
+        })
+        self.fechas = regla.generar_fechas(limite=fecha_maxima)
+        if not self.fechas:
+            raise forms.ValidationError("La serie no genera ninguna cita en el rango indicado.")
+        # Igual que CitaForm.clean_hora: la primera cita no puede quedar en una hora pasada de hoy
+        primera = timezone.make_aware(datetime.combine(self.fechas[0], cleaned_data["hora"]))
+        if self.fechas[0] == date.today() and primera < timezone.now():
+            raise forms.ValidationError({"hora": "No puedes crear citas en horas pasadas."})
+        completa = (regla.repeticiones and len(self.fechas) == regla.repeticiones) or (
+            regla.fecha_fin and regla.fecha_fin <= fecha_maxima
+        )
+        if not completa:
+            raise forms.ValidationError(f"No puedes crear citas con más de {CitaForm.DIAS_MAXIMOS_FUTURO} días de anticipación.")
+
+        ocupadas = conflictos(cleaned_data["cliente"].pk, self.fechas, cleaned_data["hora"])
+        if ocupadas:
+            raise _error_conflictos(cleaned_data["cliente"], ocupadas)
+        llenas = OcupacionFranja.objects.llenas([(f, cleaned_data["hora"]) for f in self.fechas])
+        if llenas:
+            raise FranjaLlena(llenas)
+        return cleaned_data
+
+
+class SerieEdicionForm(forms.Form):
+    """Cambios para una cita y las siguientes de su serie."""
+
+    hora = forms.TimeField(
+        widget=forms.TimeInput(attrs={"class": "form-control", "type": "time"}, format="%H:%M"),
+        label="Hora",
+    )
+    motivo = forms.CharField(
+        max_length=300,
+        widget=forms.TextInput(attrs={"class": "form-control"}),
+        label="Motivo",
+    )
+    notas = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={"class": "form-control", "rows": 2}),
+        label="Notas adicionales",
+    )
+
+    def __init__(self, *args, citas=None, cliente=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.citas = citas
+        self.cliente = cliente
+
+    def clean_hora(self):
+        return _validar_hora(self.cleaned_data.get("hora"))
+
+    def clean_motivo(self):
+        motivo = self.cleaned_data.get("motivo", "").strip()
+        if len(motivo) < 5:
+            raise forms.ValidationError("El motivo debe tener al menos 5 caracteres.")
+        return motivo
+
+    def clean(self):
+        """Valida la nueva hora contra las demás citas del cliente."""
+        cleaned_data = super().clean()
+        hora = cleaned_data.get("hora")
+        if hora and self.citas is not None:
+            actuales = list(self.citas.order_by("fecha").values_list("fecha", "hora"))
+            fechas = [fecha for fecha, _ in actuales]
+            ocupadas = conflictos(self.cliente.pk, fechas, hora, excluir=self.citas)
+            if ocupadas:
+                raise _error_conflictos(self.cliente, ocupadas)
+            llenas = OcupacionFranja.objects.llenas([(f, hora) for f in fechas], excluir=actuales)
+            if llenas:
+                raise FranjaLlena(llenas)
+        return cleaned_data
+
+
+def _resumir(textos):
+    """Primeros cinco elementos de una lista para un mensaje de error."""
+    listado = ", ".join(textos[:5])
+    if len(textos) > 5:
+        listado += f" y {len(textos) - 5} más"
+    return listado
+
+
+class AccionCitasForm(forms.Form):
+    """
+    Acción sobre varias citas seleccionadas en la lista. Toda la selección se
+    valida junta con las mismas reglas que CitaForm y cita_eliminar; si una
+    sola cita no las cumple no se aplica nada.
+    """
+
+    ACCION_CHOICES = [
+        ("", "-- Acción para seleccionadas --"),
+        ("cancelar", "Cancelar"),
+        ("desplazar", "Mover"),
+        ("eliminar", "Eliminar"),
+    ]
+
+    seleccion = forms.ModelMultipleChoiceField(
+        queryset=Cita.objects.all(),
+        error_messages={"required": "Selecciona al menos una cita."},
+    )
+    accion = forms.ChoiceField(
+        choices=ACCION_CHOICES,
+        error_messages={"required": "Elige una acción."},
+    )
+    dias = forms.IntegerField(
+        required=False,
+        min_value=-CitaForm.DIAS_MAXIMOS_FUTURO,
+        max_value=CitaForm.DIAS_MAXIMOS_FUTURO,
+    )
+    horas = forms.IntegerField(required=False, min_value=-23, max_value=23)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        citas = cleaned_data.get("seleccion")
+        accion = cleaned_data.get("accion")
+        if citas is None or not accion:
+            return cleaned_data
+
+        filas = list(
+            citas.order_by("fecha", "hora").values_list(
+                "cliente_id", "fecha", "hora", "estado", "asistio"
+            )
+        )
+        if accion == "eliminar":
+            protegidas = [f for f in filas if f[3] == "completada" and f[4] is not None]
+            if protegidas:
+                raise forms.ValidationError(
+                    f"No puedes eliminar citas completadas con registro de asistencia "
+                    f"({len(protegidas)} en la selección). Esto es para mantener el historial."
+                )
+            return cleaned_data
+
+        cerradas = [f for f in filas if f[3] not in ESTADOS_ABIERTOS]
+        if cerradas:
+            raise forms.ValidationError(
+                f"Solo se pueden cancelar o mover citas pendientes o confirmadas; "
+                f"{len(cerradas)} de la selección ya están canceladas o cerradas."
+            )
+        if accion == "desplazar":
+            delta = timedelta(
+                days=cleaned_data.get("dias") or 0, hours=cleaned_data.get("horas") or 0
+            )
+            if not delta:
+                raise forms.ValidationError("Indica cuántos días u horas mover las citas.")
+            cleaned_data["delta"] = delta
+            self._validar_desplazamiento(citas, filas, delta)
+        return cleaned_data
+
+    def _validar_desplazamiento(self, citas, filas, delta):
+        """Horario, fechas, citas cercanas del cliente y lugar en la agenda."""
+        ahora = timezone.localtime().replace(tzinfo=None)
+        fecha_maxima = date.today() + timedelta(days=CitaForm.DIAS_MAXIMOS_FUTURO)
+        nuevas = [
+            (cliente_id, datetime.combine(fecha, hora) + delta)
+            for cliente_id, fecha, hora, _, _ in filas
+        ]
+
+        errores = []
+        fuera_horario = [
+            m for _, m in nuevas if not CitaForm.HORA_INICIO <= m.time() < CitaForm.HORA_FIN
+        ]
+        if fuera_horario:
+            errores.append(
+                f"Las citas solo se pueden agendar entre {CitaForm.HORA_INICIO.strftime('%H:%M')} y "
+                f"{CitaForm.HORA_FIN.strftime('%H:%M')}; quedarían fuera: "
+                f"{_resumir([m.strftime('%d/%m/%Y %H:%M') for m in fuera_horario])}."
+            )
+        pasadas = [m for _, m in nuevas if m < ahora]
+        if pasadas:
+            errores.append(
+                f"No puedes mover citas a fechas u horas pasadas: "
+                f"{_resumir([m.strftime('%d/%m/%Y %H:%M') for m in pasadas])}."
+            )
+        lejanas = [m for _, m in nuevas if m.date() > fecha_maxima]
+        if lejanas:
+            errores.append(
+                f"No puedes agendar citas con más de {CitaForm.DIAS_MAXIMOS_FUTURO} días de "
+                f"anticipación: {_resumir([m.strftime('%d/%m/%Y') for m in lejanas])}."
+            )
+        if errores:
+            raise forms.ValidationError(errores)
+
+        cercanas = conflictos_varios(
+            [(cliente_id, m.date(), m.time()) for cliente_id, m in nuevas], excluir=citas
+        )
+        if cercanas:
+            nombres = dict(
+                Cliente.objects.filter(pk__in={c for c, _, _ in cercanas}).values_list("pk", "nombre")
+            )
+            listado = _resumir(
+                [f"{nombres[c]} ({f:%d/%m/%Y} {h:%H:%M})" for c, f, h in cercanas]
+            )
+            raise forms.ValidationError(
+                f"Estos clientes ya tienen otra cita a menos de 30 minutos: {listado}."
+            )
+        llenas = OcupacionFranja.objects.llenas(
+            [(m.date(), m.time()) for _, m in nuevas],
+            excluir=[(fecha, hora) for _, fecha, hora, _, _ in filas],
+        )
+        if llenas:
+            raise FranjaLlena(llenas)
+
+
 class AsistenciaForm(forms.Form):
     """Formulario para registrar asistencia."""
 
@@ -248,7 +542,55 @@ class ReporteForm(forms.Form):
     cliente = forms.ModelChoiceField(
         required=False,
         queryset=Cliente.objects.all(),
-        widget=forms.Select(attrs={"class": "form-select"}),
+        widget=ClienteAutocompleteWidget(),
         label="Cliente",
         empty_label="Todos",
     )
+
+
+class OcupacionForm(forms.Form):
+    """Filtros del mapa de calor de ocupación."""
+
+    METRICA_CHOICES = [
+        ("total", "Citas"),
+        ("tasa_asistencia", "Tasa de asistencia"),
+        ("no_asistidas", "Inasistencias"),
+        ("canceladas", "Cancelaciones"),
+    ]
+    DIAS_POR_DEFECTO = 365
+
+    fecha_inicio = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+        label="Desde",
+    )
+    fecha_fin = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+        label="Hasta",
+    )
+    estado = forms.ChoiceField(
+        required=False,
+        choices=[("", "Todos")] + Cita.ESTADO_CHOICES,
+        widget=forms.Select(attrs={"class": "form-select"}),
+        label="Estado",
+    )
+    metrica = forms.ChoiceField(
+        required=False,
+        choices=METRICA_CHOICES,
+        widget=forms.Select(attrs={"class": "form-select"}),
+        label="Métrica",
+    )
+
+    def clean(self):
+        """Completa el rango por defecto (último año) y valida su orden."""
+        cleaned_data = super().clean()
+        hoy = date.today()
+        fecha_fin = cleaned_data.get("fecha_fin") or hoy
+        fecha_inicio = cleaned_data.get("fecha_inicio") or fecha_fin - timedelta(days=self.DIAS_POR_DEFECTO)
+        if fecha_inicio > fecha_fin:
+            raise forms.ValidationError("La fecha inicial no puede ser posterior a la final.")
+        cleaned_data["fecha_inicio"] = fecha_inicio
+        cleaned_data["fecha_fin"] = fecha_fin
+        cleaned_data["metrica"] = cleaned_data.get("metrica") or "total"
+        return cleaned_data
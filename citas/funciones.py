@@ -0,0 +1,23 @@
+"""Funciones de base de datos compartidas por los cálculos por franja horaria."""
+from django.db.models.functions import ExtractHour, ExtractWeekDay
+
+
+class DiaSemana(ExtractWeekDay):
+    """
+    Día de la semana, 1 (domingo) a 7 (sábado).
+
+    En SQLite usa strftime nativo en lugar de la función Python por fila
+    que registra Django, mucho más lenta en tablas grandes.
+    """
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"(CAST(strftime('%%w', {sql}) AS INTEGER) + 1)", params
+
+
+class Hora(ExtractHour):
+    """Hora del día (0-23), con strftime nativo en SQLite."""
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"CAST(strftime('%%H', {sql}) AS INTEGER)", params
@@ -0,0 +1,110 @@
+import asyncio
+import ssl
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide cuántas conexiones lentas simultáneas soporta un servidor en marcha. "
+        "Abre N clientes que envían la petición poco a poco (como un móvil con mala "
+        "señal) y mide la latencia de peticiones normales mientras tanto. "
+        "Ejecutar contra el despliegue WSGI y el ASGI en el mismo equipo para compararlos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="URL a probar, p. ej. la página de confirmación de una cita.")
+        parser.add_argument("--conexiones", type=int, default=50, help="Clientes lentos simultáneos.")
+        parser.add_argument(
+            "--duracion-envio",
+            type=float,
+            default=5.0,
+            help="Segundos que tarda cada cliente lento en enviar su petición.",
+        )
+        parser.add_argument("--sondas", type=int, default=20, help="Peticiones normales a medir.")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Tiempo máximo por petición.")
+
+    def handle(self, *args, **options):
+        partes = urlsplit(options["url"])
+        if partes.scheme not in ("http", "https") or not partes.hostname:
+            raise CommandError("La URL debe ser http:// o https:// con host.")
+        resultado = asyncio.run(self._medir(partes, options))
+
+        sondas = resultado["sondas"]
+        self.stdout.write(f"Clientes lentos: {options['conexiones']} ({resultado['lentos_ok']} respondidos)")
+        if sondas:
+            self.stdout.write(
+                f"Sondas: {len(sondas)}/{options['sondas']} OK, "
+                f"p50 {statistics.median(sondas) * 1000:.0f} ms, "
+                f"máx {max(sondas) * 1000:.0f} ms"
+            )
+        else:
+            self.stdout.write(self.style.ERROR("Ninguna sonda obtuvo respuesta a tiempo."))
+        self.stdout.write(f"Errores/timeouts: {resultado['errores']}")
+
+    async def _medir(self, partes, options):
+        ruta = partes.path or "/"
+        if partes.query:
+            ruta += f"?{partes.query}"
+        peticion = (
+            f"GET {ruta} HTTP/1.1\r\nHost: {partes.netloc}\r\n"
+            f"User-Agent: benchmark-concurrencia\r\nConnection: close\r\n\r\n"
+        ).encode()
+        errores = 0
+
+        async def solicitar(duracion_envio):
+            nonlocal errores
+            inicio = time.perf_counter()
+            try:
+                ok = await asyncio.wait_for(
+                    self._enviar(partes, peticion, duracion_envio), options["timeout"]
+                )
+            except (OSError, asyncio.TimeoutError):
+                ok = False
+            if not ok:
+                errores += 1
+                return None
+            return time.perf_counter() - inicio
+
+        lentos = [
+            asyncio.create_task(solicitar(options["duracion_envio"]))
+            for _ in range(options["conexiones"])
+        ]
+        # Dar tiempo a que los clientes lentos ocupen sus conexiones
+        await asyncio.sleep(min(1.0, options["duracion_envio"] / 2))
+
+        sondas = []
+        for _ in range(options["sondas"]):
+            latencia = await solicitar(0)
+            if latencia:
+                sondas.append(latencia)
+
+        lentos_ok = sum(1 for r in await asyncio.gather(*lentos) if r)
+        return {"sondas": sondas, "lentos_ok": lentos_ok, "errores": errores}
+
+    async def _enviar(self, partes, peticion, duracion_envio):
+        """Envía la petición (repartida en `duracion_envio` segundos) y lee la respuesta."""
+        https = partes.scheme == "https"
+        lector, escritor = await asyncio.open_connection(
+            partes.hostname,
+            partes.port or (443 if https else 80),
+            ssl=ssl.create_default_context() if https else None,
+        )
+        try:
+            if duracion_envio:
+                pausa = duracion_envio / len(peticion)
+                for i in range(len(peticion)):
+                    escritor.write(peticion[i:i + 1])
+                    await escritor.drain()
+                    await asyncio.sleep(pausa)
+            else:
+                escritor.write(peticion)
+                await escritor.drain()
+            estado = await lector.readline()
+            await lector.read()
+            return estado.startswith(b"HTTP/1.1 2") or estado.startswith(b"HTTP/1.1 3")
+        finally:
+            escritor.close()
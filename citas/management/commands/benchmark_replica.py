@@ -0,0 +1,92 @@
+import multiprocessing
+import statistics
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+
+from citas.models import Cita
+from citas.replica import ALIAS_REPLICA, replica_disponible
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de escritura en la base principal mientras varios procesos "
+        "ejecutan las consultas del reporte de asistencia, primero contra la "
+        "principal y luego contra la réplica."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--escrituras", type=int, default=200, help="Escrituras a medir.")
+        parser.add_argument("--lectores", type=int, default=4, help="Procesos de carga de reportes.")
+        parser.add_argument(
+            "--max-p95-ms",
+            type=float,
+            default=None,
+            help="Falla si el p95 de escritura con los reportes en la réplica supera este valor.",
+        )
+
+    def handle(self, *args, **options):
+        if ALIAS_REPLICA not in connections.settings:
+            raise CommandError("No hay alias 'replica' configurado (p. ej. DB_REPLICA=snapshot).")
+        if not replica_disponible():
+            call_command("snapshot_replica", stdout=self.stdout)
+
+        cita_pk = Cita.objects.order_by("pk").values_list("pk", flat=True).first()
+        if cita_pk is None:
+            raise CommandError("Se necesita al menos una cita para medir.")
+
+        for alias in ("default", ALIAS_REPLICA):
+            latencias = self._medir(alias, cita_pk, options)
+            latencias.sort()
+            p95 = latencias[int(len(latencias) * 0.95) - 1]
+            self.stdout.write(
+                f"Reportes en '{alias}': escritura p50 {statistics.median(latencias):.1f} ms, "
+                f"p95 {p95:.1f} ms, máx {latencias[-1]:.1f} ms"
+            )
+
+        limite = options["max_p95_ms"]
+        if limite is not None:
+            # `p95` es el de la última vuelta: reportes en la réplica
+            if p95 > limite:
+                raise CommandError(
+                    f"p95 de escritura de {p95:.1f} ms supera el límite de {limite:.1f} ms."
+                )
+            self.stdout.write(self.style.SUCCESS(f"p95 de escritura de {p95:.1f} ms dentro del límite."))
+
+    def _medir(self, alias, cita_pk, options):
+        # Procesos (no hilos) para que el GIL no distorsione la medición
+        contexto = multiprocessing.get_context("fork")
+        detener = contexto.Event()
+        connections.close_all()
+        lectores = [
+            contexto.Process(target=_cargar_reportes, args=(alias, detener), daemon=True)
+            for _ in range(options["lectores"])
+        ]
+        for lector in lectores:
+            lector.start()
+        time.sleep(0.5)
+
+        latencias = []
+        try:
+            for i in range(options["escrituras"]):
+                inicio = time.perf_counter()
+                Cita.objects.filter(pk=cita_pk).update(notas=f"benchmark {i}")
+                latencias.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            detener.set()
+            for lector in lectores:
+                lector.join()
+        return latencias
+
+
+def _cargar_reportes(alias, detener):
+    """Repite las consultas del reporte de asistencia hasta que se detenga."""
+    connections.close_all()
+    while not detener.is_set():
+        citas = Cita.objects.using(alias)
+        citas.count()
+        citas.filter(asistio=True).count()
+        list(citas.values("estado").annotate(total=Count("pk")))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from citas.duplicados import UMBRAL_PUNTAJE, buscar_duplicados
+
+
+class Command(BaseCommand):
+    help = "Detecta clientes que podrían estar registrados más de una vez."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--umbral",
+            type=float,
+            default=UMBRAL_PUNTAJE,
+            help=f"Similitud mínima (0-1) para proponer un par. Por defecto, {UMBRAL_PUNTAJE}.",
+        )
+
+    def handle(self, *args, **options):
+        comparados, encontrados = buscar_duplicados(umbral=options["umbral"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{comparados} par(es) comparado(s); {encontrados} posible(s) duplicado(s) "
+                "pendiente(s) de revisión."
+            )
+        )
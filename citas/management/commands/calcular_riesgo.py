@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from citas.riesgo import calcular_riesgos
+
+
+class Command(BaseCommand):
+    help = "Calcula el riesgo de inasistencia de las citas próximas a partir del historial."
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        historicas, calificadas = calcular_riesgos()
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{calificadas} cita(s) calificada(s) con {historicas} cita(s) de historial "
+                f"en {duracion:.2f}s."
+            )
+        )
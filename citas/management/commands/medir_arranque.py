@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Se ejecuta en un proceso nuevo para medir un arranque en frío real
+SCRIPT = r"""
+import json, os, time
+inicio = time.perf_counter()
+from config.wsgi import application
+importado = time.perf_counter()
+
+from django.conf import settings
+from django.test import Client
+settings.ALLOWED_HOSTS = ["*"]
+cliente = Client()
+
+def medir(url):
+    t = time.perf_counter()
+    estado = cliente.get(url, secure=True).status_code
+    return estado, (time.perf_counter() - t) * 1000
+
+resultado = {"importacion_ms": (importado - inicio) * 1000}
+resultado["login"] = medir("/accounts/login/")
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+usuario = get_user_model().objects.filter(is_active=True).order_by("pk").first()
+if usuario:
+    # El login escribe una sesión y last_login: se revierte al terminar
+    with transaction.atomic():
+        cliente.force_login(usuario)
+        resultado["dashboard"] = medir("/")
+        resultado["dashboard_2"] = medir("/")
+        transaction.set_rollback(True)
+print(json.dumps(resultado))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo de importación de Django y de la primera petición en un "
+        "proceso nuevo, con y sin calentamiento, para detectar regresiones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-ms",
+            type=float,
+            default=None,
+            help="Falla si importación + primera petición (con calentamiento) supera este valor.",
+        )
+
+    def _medir(self, calentar):
+        entorno = {**os.environ, "WARMUP_ON_START": "1" if calentar else "0"}
+        proceso = subprocess.run(
+            [sys.executable, "-c", SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=entorno,
+            capture_output=True,
+            text=True,
+        )
+        if proceso.returncode != 0:
+            raise CommandError(proceso.stderr.strip() or "El proceso de medición falló.")
+        return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        resultados = {}
+        for calentar in (False, True):
+            resultado = self._medir(calentar)
+            resultados[calentar] = resultado
+            titulo = "Con calentamiento" if calentar else "Sin calentamiento"
+            self.stdout.write(f"{titulo}:")
+            self.stdout.write(f"  importación: {resultado['importacion_ms']:.0f} ms")
+            for clave in ("login", "dashboard", "dashboard_2"):
+                if clave in resultado:
+                    estado, ms = resultado[clave]
+                    self.stdout.write(f"  {clave}: {ms:.0f} ms (HTTP {estado})")
+
+        limite = options["max_ms"]
+        if limite is not None:
+            calentado = resultados[True]
+            primera = calentado.get("dashboard", calentado["login"])[1]
+            total = calentado["importacion_ms"] + primera
+            if total > limite:
+                raise CommandError(f"Arranque de {total:.0f} ms supera el límite de {limite:.0f} ms.")
+            self.stdout.write(self.style.SUCCESS(f"Arranque de {total:.0f} ms dentro del límite."))
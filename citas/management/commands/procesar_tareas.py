@@ -0,0 +1,79 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+
+from citas import tareas
+
+
+class Command(BaseCommand):
+    help = "Ejecuta las tareas en segundo plano encoladas en la base de datos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modo",
+            choices=["hilos", "procesos"],
+            default="hilos",
+            help="Pool de ejecución: hilos (por defecto) o procesos para tareas de CPU.",
+        )
+        parser.add_argument("--concurrencia", type=int, default=2, help="Tareas simultáneas.")
+        parser.add_argument(
+            "--espera",
+            type=float,
+            default=2.0,
+            help="Segundos entre consultas a la cola cuando está vacía.",
+        )
+        parser.add_argument(
+            "--una-vez",
+            action="store_true",
+            help="Procesar lo pendiente y terminar (útil como tarea programada).",
+        )
+        parser.add_argument(
+            "--rescatar-minutos",
+            type=int,
+            default=30,
+            help="Reencolar tareas 'en proceso' sin actividad desde hace N minutos.",
+        )
+
+    def handle(self, *args, **options):
+        rescatadas = tareas.rescatar_abandonadas(options["rescatar_minutos"])
+        if rescatadas:
+            self.stdout.write(f"{rescatadas} tarea(s) abandonada(s) reencolada(s).")
+
+        if options["modo"] == "procesos":
+            # "spawn" y no "fork": un proceso hijo no hereda la conexión abierta
+            # del padre (cerrarla en el hijo cortaría también la del padre)
+            pool = ProcessPoolExecutor(
+                max_workers=options["concurrencia"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        else:
+            pool = ThreadPoolExecutor(max_workers=options["concurrencia"])
+
+        en_curso = {}
+        with pool:
+            try:
+                while True:
+                    while len(en_curso) < options["concurrencia"]:
+                        tarea_pk = tareas.reclamar_siguiente()
+                        if tarea_pk is None:
+                            break
+                        self.stdout.write(f"→ tarea {tarea_pk}")
+                        en_curso[pool.submit(tareas.ejecutar, tarea_pk)] = tarea_pk
+
+                    if not en_curso:
+                        if options["una_vez"]:
+                            break
+                        time.sleep(options["espera"])
+                        continue
+
+                    terminadas, _ = wait(en_curso, timeout=options["espera"], return_when=FIRST_COMPLETED)
+                    for futuro in terminadas:
+                        tarea_pk = en_curso.pop(futuro)
+                        futuro.result()
+                        self.stdout.write(f"← tarea {tarea_pk} terminada")
+            except KeyboardInterrupt:
+                self.stdout.write("Deteniendo: esperando a que terminen las tareas en curso...")
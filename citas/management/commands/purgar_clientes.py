@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from citas.purga import TAMANO_LOTE, purgar_clientes
+
+
+class Command(BaseCommand):
+    help = "Elimina físicamente los clientes dados de baja y sus citas, por lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=0,
+            help="Solo purgar clientes eliminados hace al menos N días (por defecto 0).",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=TAMANO_LOTE,
+            help=f"Filas por sentencia DELETE (por defecto {TAMANO_LOTE}).",
+        )
+
+    def handle(self, *args, **options):
+        antes_de = timezone.now() - timedelta(days=options["dias"])
+        inicio = time.perf_counter()
+        clientes, citas = purgar_clientes(antes_de=antes_de, lote=options["lote"])
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purgados {clientes} cliente(s) y {citas} cita(s) en {duracion:.2f}s."
+            )
+        )
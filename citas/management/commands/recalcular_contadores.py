@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from citas.models import Cliente
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de asistencia de los clientes a partir de sus citas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cliente",
+            type=int,
+            action="append",
+            dest="clientes",
+            help="ID de cliente a recalcular (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        clientes = Cliente.objects.all()
+        if options["clientes"]:
+            clientes = clientes.filter(pk__in=options["clientes"])
+
+        with transaction.atomic():
+            actualizados = clientes.recalcular_contadores()
+
+        self.stdout.write(self.style.SUCCESS(f"Contadores recalculados para {actualizados} cliente(s)."))
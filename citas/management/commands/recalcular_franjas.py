@@ -0,0 +1,20 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from citas.models import OcupacionFranja
+
+
+class Command(BaseCommand):
+    help = "Recalcula la ocupación de las franjas de la agenda a partir de las citas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--desde",
+            help="Fecha inicial (AAAA-MM-DD). Por defecto, hoy.",
+        )
+
+    def handle(self, *args, **options):
+        desde = date.fromisoformat(options["desde"]) if options["desde"] else None
+        total = OcupacionFranja.objects.recalcular(desde)
+        self.stdout.write(self.style.SUCCESS(f"Ocupación recalculada para {total} franja(s)."))
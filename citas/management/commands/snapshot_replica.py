@@ -0,0 +1,52 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia la base SQLite principal a la réplica de solo lectura "
+        "(DB_REPLICA=snapshot) con la API de respaldo en línea de SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--intervalo",
+            type=int,
+            default=0,
+            help="Repetir cada N segundos (0 = una sola vez).",
+        )
+
+    def handle(self, *args, **options):
+        destino = getattr(settings, "REPLICA_SNAPSHOT_PATH", None)
+        if destino is None:
+            raise CommandError("La réplica por snapshot no está activa (DB_REPLICA=snapshot).")
+        if connections["default"].vendor != "sqlite":
+            raise CommandError("El snapshot solo aplica cuando la base principal es SQLite.")
+
+        while True:
+            inicio = time.perf_counter()
+            self._copiar(settings.DATABASES["default"]["NAME"], destino)
+            self.stdout.write(
+                f"Réplica actualizada en {(time.perf_counter() - inicio) * 1000:.0f} ms."
+            )
+            if not options["intervalo"]:
+                return
+            time.sleep(options["intervalo"])
+
+    def _copiar(self, origen, destino):
+        """Copia consistente a un archivo temporal y reemplazo atómico."""
+        temporal = f"{destino}.tmp"
+        fuente = sqlite3.connect(origen)
+        copia = sqlite3.connect(temporal)
+        try:
+            fuente.backup(copia)
+        finally:
+            copia.close()
+            fuente.close()
+        # Las conexiones nuevas de la réplica abren el archivo actualizado
+        os.replace(temporal, destino)
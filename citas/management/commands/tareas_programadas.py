@@ -0,0 +1,32 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Tareas de mantenimiento para programar una vez al día: limpia sesiones "
+        "expiradas, recalcula contadores, ocupación de franjas y riesgo, purga "
+        "clientes eliminados y busca clientes duplicados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias-purga",
+            type=int,
+            default=30,
+            help="Antigüedad mínima (días) de los clientes eliminados a purgar.",
+        )
+
+    def handle(self, *args, **options):
+        tareas = [
+            ("clearsessions", {}),
+            ("recalcular_contadores", {}),
+            ("recalcular_franjas", {}),
+            ("calcular_riesgo", {}),
+            ("purgar_clientes", {"dias": options["dias_purga"]}),
+            ("buscar_duplicados", {}),
+        ]
+        for nombre, opciones in tareas:
+            self.stdout.write(f"→ {nombre}")
+            call_command(nombre, stdout=self.stdout, stderr=self.stderr, **opciones)
+        self.stdout.write(self.style.SUCCESS("Tareas programadas completadas."))
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:39
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def poblar_contadores(apps, schema_editor):
+    Cliente = apps.get_model("citas", "Cliente")
+    Cita = apps.get_model("citas", "Cita")
+
+    def citas(**filtros):
+        return (
+            Cita.objects.filter(cliente=OuterRef("pk"), **filtros)
+            .order_by()
+            .values("cliente")
+        )
+
+    def conteo(**filtros):
+        return Coalesce(
+            Subquery(citas(**filtros).annotate(n=Count("pk")).values("n")), 0
+        )
+
+    Cliente.objects.update(
+        total_citas=conteo(),
+        citas_asistidas=conteo(asistio=True),
+        citas_no_asistidas=conteo(asistio=False),
+        citas_canceladas=conteo(estado="cancelada"),
+        ultima_visita=Subquery(
+            citas(asistio=True).annotate(m=Max("fecha")).values("m")
+        ),
+        proxima_cita=Subquery(
+            citas(fecha__gte=timezone.localdate())
+            .exclude(estado__in=["cancelada", "completada", "no_asistio"])
+            .annotate(m=Min("fecha"))
+            .values("m")
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cliente",
+            name="citas_asistidas",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Citas asistidas"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cliente",
+            name="citas_canceladas",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Citas canceladas"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cliente",
+            name="citas_no_asistidas",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Inasistencias"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cliente",
+            name="proxima_cita",
+            field=models.DateField(
+                blank=True, editable=False, null=True, verbose_name="Próxima cita"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cliente",
+            name="total_citas",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Total de citas"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cliente",
+            name="ultima_visita",
+            field=models.DateField(
+                blank=True, editable=False, null=True, verbose_name="Última visita"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cita",
+            index=models.Index(
+                fields=["cliente", "fecha"], name="cita_cliente_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cliente",
+            index=models.Index(
+                fields=["citas_no_asistidas"], name="cliente_inasistencias_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cliente",
+            index=models.Index(
+                fields=["ultima_visita"], name="cliente_ultima_visita_idx"
+            ),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
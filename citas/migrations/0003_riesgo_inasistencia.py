@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0002_contadores_cliente"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cita",
+            name="riesgo_inasistencia",
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Riesgo de inasistencia",
+            ),
+        ),
+    ]
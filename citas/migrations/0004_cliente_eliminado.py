@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0003_riesgo_inasistencia"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cliente",
+            name="eliminado",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="Fecha de eliminación",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:46
+
+from django.db import migrations, models
+
+from citas.normalizacion import normalizar_nombre, normalizar_telefono
+
+
+def poblar_busqueda(apps, schema_editor):
+    Cliente = apps.get_model("citas", "Cliente")
+    clientes = list(Cliente.objects.only("nombre", "telefono"))
+    for cliente in clientes:
+        cliente.nombre_busqueda = normalizar_nombre(cliente.nombre)
+        cliente.telefono_normalizado = normalizar_telefono(cliente.telefono)
+    Cliente.objects.bulk_update(
+        clientes, ["nombre_busqueda", "telefono_normalizado"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0004_cliente_eliminado"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cliente",
+            name="nombre_busqueda",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=200
+            ),
+        ),
+        migrations.AddField(
+            model_name="cliente",
+            name="telefono_normalizado",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=20
+            ),
+        ),
+        migrations.RunPython(poblar_busqueda, migrations.RunPython.noop),
+    ]
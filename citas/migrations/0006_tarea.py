@@ -0,0 +1,129 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("citas", "0005_busqueda_cliente"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tarea",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nombre", models.CharField(max_length=100, verbose_name="Tarea")),
+                (
+                    "argumentos",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Argumentos"
+                    ),
+                ),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("en_proceso", "En proceso"),
+                            ("completada", "Completada"),
+                            ("fallida", "Fallida"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "progreso",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Progreso (%)"
+                    ),
+                ),
+                (
+                    "mensaje",
+                    models.CharField(
+                        blank=True, max_length=300, verbose_name="Mensaje"
+                    ),
+                ),
+                (
+                    "resultado",
+                    models.JSONField(blank=True, null=True, verbose_name="Resultado"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "intentos",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Intentos"
+                    ),
+                ),
+                (
+                    "max_intentos",
+                    models.PositiveSmallIntegerField(
+                        default=3, verbose_name="Máximo de intentos"
+                    ),
+                ),
+                (
+                    "ejecutar_despues",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Ejecutar a partir de",
+                    ),
+                ),
+                (
+                    "iniciado",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Inicio"),
+                ),
+                (
+                    "terminado",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Fin"),
+                ),
+                (
+                    "creado",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de creación"
+                    ),
+                ),
+                (
+                    "actualizado",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Última actualización"
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="tareas",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Solicitada por",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tarea en segundo plano",
+                "verbose_name_plural": "Tareas en segundo plano",
+                "ordering": ["-creado"],
+                "indexes": [
+                    models.Index(
+                        fields=["estado", "ejecutar_despues"], name="tarea_cola_idx"
+                    )
+                ],
+            },
+        ),
+    ]
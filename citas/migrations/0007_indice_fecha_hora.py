@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0006_tarea"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cita",
+            index=models.Index(fields=["fecha", "hora"], name="cita_fecha_hora_idx"),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0007_indice_fecha_hora"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SerieCita",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hora", models.TimeField(verbose_name="Hora de las citas")),
+                ("motivo", models.CharField(max_length=300, verbose_name="Motivo")),
+                (
+                    "notas",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Notas adicionales"
+                    ),
+                ),
+                (
+                    "intervalo",
+                    models.PositiveSmallIntegerField(
+                        default=1, verbose_name="Repetir cada"
+                    ),
+                ),
+                (
+                    "unidad",
+                    models.CharField(
+                        choices=[
+                            ("dias", "Días"),
+                            ("semanas", "Semanas"),
+                            ("meses", "Meses"),
+                        ],
+                        default="semanas",
+                        max_length=10,
+                        verbose_name="Unidad",
+                    ),
+                ),
+                (
+                    "dia_semana",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        choices=[
+                            (0, "Lunes"),
+                            (1, "Martes"),
+                            (2, "Miércoles"),
+                            (3, "Jueves"),
+                            (4, "Viernes"),
+                            (5, "Sábado"),
+                            (6, "Domingo"),
+                        ],
+                        null=True,
+                        verbose_name="Día de la semana",
+                    ),
+                ),
+                ("fecha_inicio", models.DateField(verbose_name="Primera fecha")),
+                (
+                    "fecha_fin",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="Repetir hasta"
+                    ),
+                ),
+                (
+                    "repeticiones",
+                    models.PositiveSmallIntegerField(
+                        blank=True, null=True, verbose_name="Número de citas"
+                    ),
+                ),
+                (
+                    "creado",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de creación"
+                    ),
+                ),
+                (
+                    "cliente",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="series",
+                        to="citas.cliente",
+                        verbose_name="Cliente",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Serie de citas",
+                "verbose_name_plural": "Series de citas",
+                "ordering": ["-creado"],
+            },
+        ),
+        migrations.AddField(
+            model_name="cita",
+            name="serie",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="citas",
+                to="citas.seriecita",
+                verbose_name="Serie",
+            ),
+        ),
+    ]
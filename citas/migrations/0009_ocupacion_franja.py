@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:05
+
+from collections import Counter
+from datetime import time
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def poblar_ocupacion(apps, schema_editor):
+    Cita = apps.get_model("citas", "Cita")
+    OcupacionFranja = apps.get_model("citas", "OcupacionFranja")
+    conteos = Counter()
+    citas = (
+        Cita.objects.filter(fecha__gte=timezone.localdate())
+        .exclude(estado="cancelada")
+        .values_list("fecha", "hora")
+    )
+    for fecha, hora in citas.iterator(chunk_size=5000):
+        minutos = hora.hour * 60 + hora.minute
+        minutos -= minutos % settings.MINUTOS_POR_FRANJA
+        conteos[(fecha, time(minutos // 60, minutos % 60))] += 1
+    OcupacionFranja.objects.bulk_create(
+        [
+            OcupacionFranja(
+                fecha=fecha,
+                hora=hora,
+                ocupadas=ocupadas,
+                capacidad=settings.CAPACIDAD_FRANJA,
+            )
+            for (fecha, hora), ocupadas in conteos.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0008_serie_cita"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OcupacionFranja",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fecha", models.DateField(verbose_name="Fecha")),
+                ("hora", models.TimeField(verbose_name="Inicio de la franja")),
+                (
+                    "ocupadas",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="Citas"),
+                ),
+                (
+                    "capacidad",
+                    models.PositiveSmallIntegerField(verbose_name="Capacidad"),
+                ),
+            ],
+            options={
+                "verbose_name": "Ocupación de franja",
+                "verbose_name_plural": "Ocupación de franjas",
+                "ordering": ["fecha", "hora"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="ocupacionfranja",
+            constraint=models.UniqueConstraint(
+                fields=("fecha", "hora"), name="franja_unica"
+            ),
+        ),
+        migrations.RunPython(poblar_ocupacion, migrations.RunPython.noop),
+    ]
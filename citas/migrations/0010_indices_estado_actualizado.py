@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0009_ocupacion_franja"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cita",
+            index=models.Index(
+                fields=["estado", "fecha"], name="cita_estado_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cita",
+            index=models.Index(fields=["actualizado"], name="cita_actualizado_idx"),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0010_indices_estado_actualizado"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PosibleDuplicado",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("puntaje", models.FloatField(verbose_name="Similitud")),
+                (
+                    "motivos",
+                    models.CharField(max_length=100, verbose_name="Coincidencias"),
+                ),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("fusionado", "Fusionado"),
+                            ("descartado", "Descartado"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "creado",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de detección"
+                    ),
+                ),
+                (
+                    "revisado",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Fecha de revisión"
+                    ),
+                ),
+                (
+                    "cliente",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="citas.cliente",
+                        verbose_name="Cliente",
+                    ),
+                ),
+                (
+                    "duplicado",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="citas.cliente",
+                        verbose_name="Posible duplicado",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Posible duplicado",
+                "verbose_name_plural": "Posibles duplicados",
+                "ordering": ["-puntaje"],
+                "indexes": [
+                    models.Index(
+                        fields=["estado", "puntaje"], name="duplicado_revision_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="posibleduplicado",
+            constraint=models.UniqueConstraint(
+                fields=("cliente", "duplicado"), name="duplicado_par_unico"
+            ),
+        ),
+    ]
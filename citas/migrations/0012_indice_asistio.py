@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("citas", "0011_posible_duplicado"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cita",
+            index=models.Index(
+                fields=["asistio", "fecha"], name="cita_asistio_fecha_idx"
+            ),
+        ),
+    ]
@@ -1,9 +1,163 @@
+import calendar
 import uuid
-from django.db import models
+from collections import Counter
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.urls import reverse
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 import re
 
+from . import condicional
+from .enlaces import generar_token
+from .normalizacion import normalizar_nombre, normalizar_telefono
+from .transacciones import transaccion_reserva
+
+
+# Estados que ya no cuentan como cita próxima
+ESTADOS_CERRADOS = ["cancelada", "completada", "no_asistio"]
+ESTADOS_ABIERTOS = ["pendiente", "confirmada"]
+
+CAMPOS_CONTADORES = (
+    "total_citas",
+    "citas_asistidas",
+    "citas_no_asistidas",
+    "citas_canceladas",
+)
+
+
+def _contribucion(estado, asistio):
+    """Aporte de una cita a cada contador del cliente."""
+    return Counter({
+        "total_citas": 1,
+        "citas_asistidas": int(asistio is True),
+        "citas_no_asistidas": int(asistio is False),
+        "citas_canceladas": int(estado == "cancelada"),
+    })
+
+
+def _subconsulta_citas(**filtros):
+    """Citas del cliente de la fila externa, sin ordenamiento."""
+    return (
+        Cita.objects.filter(cliente=OuterRef("pk"), **filtros)
+        .order_by()
+        .values("cliente")
+    )
+
+
+def _expresiones_fechas():
+    """Expresiones para recalcular última visita y próxima cita en un UPDATE."""
+    hoy = timezone.localdate()
+    return {
+        "ultima_visita": Subquery(
+            _subconsulta_citas(asistio=True).annotate(m=Max("fecha")).values("m")
+        ),
+        "proxima_cita": Subquery(
+            _subconsulta_citas(fecha__gte=hoy)
+            .exclude(estado__in=ESTADOS_CERRADOS)
+            .annotate(m=Min("fecha"))
+            .values("m")
+        ),
+    }
+
+
+class ClienteQuerySet(models.QuerySet):
+    """QuerySet con el mantenimiento de contadores de asistencia."""
+
+    def registrar_cambio(self, previo, actual):
+        """
+        Aplica la diferencia entre dos huellas (cliente_id, estado, asistio)
+        de una cita a los contadores con expresiones F.
+
+        `previo` es None al crear y `actual` es None al eliminar.
+        """
+        deltas = {}
+        if previo:
+            deltas.setdefault(previo[0], Counter()).subtract(_contribucion(*previo[1:]))
+        if actual:
+            deltas.setdefault(actual[0], Counter()).update(_contribucion(*actual[1:]))
+
+        for cliente_id, delta in deltas.items():
+            cambios = {
+                campo: F(campo) + valor for campo, valor in delta.items() if valor
+            }
+            self.filter(pk=cliente_id).update(**cambios, **_expresiones_fechas())
+
+    def buscar(self, texto, limite=10):
+        """
+        Búsqueda por prefijo del nombre normalizado o de los dígitos del
+        teléfono. Usa rangos (>= prefijo, < prefijo + U+FFFF) para que la
+        consulta se resuelva con el índice en cualquier base de datos.
+        """
+        digitos = normalizar_telefono(texto)
+        if digitos and len(digitos) >= 3 and not re.search(r"[^\d\s\-\(\)\+]", texto):
+            campo, prefijo = "telefono_normalizado", digitos
+        else:
+            campo, prefijo = "nombre_busqueda", normalizar_nombre(texto)
+        if not prefijo:
+            return self.none()
+        return self.filter(
+            **{f"{campo}__gte": prefijo, f"{campo}__lt": prefijo + "\uffff"}
+        ).order_by(campo)[:limite]
+
+    def vigentes(self):
+        """Clientes que no han sido eliminados (borrado lógico)."""
+        return self.filter(eliminado__isnull=True)
+
+    def con_citas_futuras(self):
+        """Clientes con citas próximas aún abiertas."""
+        return self.filter(
+            Exists(
+                Cita.objects.filter(
+                    cliente=OuterRef("pk"), fecha__gte=timezone.localdate()
+                ).exclude(estado__in=ESTADOS_CERRADOS)
+            )
+        )
+
+    def desactivar(self):
+        """Marca los clientes como inactivos en un solo UPDATE."""
+        from .resumen import invalidar_resumen
+
+        total = self.update(activo=False, actualizado=timezone.now())
+        # update() no envía post_save: el resumen del dashboard se invalida aquí
+        invalidar_resumen()
+        return total
+
+    def marcar_eliminados(self):
+        """
+        Borrado lógico inmediato: los clientes dejan de mostrarse y sus filas
+        se eliminan después con el comando `purgar_clientes`.
+        """
+        from .resumen import invalidar_resumen
+
+        ahora = timezone.now()
+        total = self.vigentes().update(activo=False, eliminado=ahora, actualizado=ahora)
+        invalidar_resumen()
+        return total
+
+    def recalcular_contadores(self):
+        """Recalcula todos los contadores desde las citas en una sola sentencia."""
+
+        def _conteo(**filtros):
+            return Coalesce(
+                Subquery(
+                    _subconsulta_citas(**filtros).annotate(n=Count("pk")).values("n")
+                ),
+                0,
+            )
+
+        condicional.invalidar("contadores")
+        return self.update(
+            total_citas=_conteo(),
+            citas_asistidas=_conteo(asistio=True),
+            citas_no_asistidas=_conteo(asistio=False),
+            citas_canceladas=_conteo(estado="cancelada"),
+            **_expresiones_fechas(),
+        )
+
 
 class Cliente(models.Model):
     """Modelo para gestionar clientes."""
@@ -15,15 +169,46 @@ class Cliente(models.Model):
     activo = models.BooleanField("Activo", default=True)
     creado = models.DateTimeField("Fecha de creación", auto_now_add=True)
     actualizado = models.DateTimeField("Última actualización", auto_now=True)
+    nombre_busqueda = models.CharField(
+        max_length=200, blank=True, editable=False, db_index=True
+    )
+    telefono_normalizado = models.CharField(
+        max_length=20, blank=True, editable=False, db_index=True
+    )
+    eliminado = models.DateTimeField(
+        "Fecha de eliminación", null=True, blank=True, editable=False, db_index=True
+    )
+
+    # Contadores desnormalizados, mantenidos por Cita.save()/Cita.delete()
+    total_citas = models.PositiveIntegerField("Total de citas", default=0, editable=False)
+    citas_asistidas = models.PositiveIntegerField("Citas asistidas", default=0, editable=False)
+    citas_no_asistidas = models.PositiveIntegerField("Inasistencias", default=0, editable=False)
+    citas_canceladas = models.PositiveIntegerField("Citas canceladas", default=0, editable=False)
+    ultima_visita = models.DateField("Última visita", null=True, blank=True, editable=False)
+    proxima_cita = models.DateField("Próxima cita", null=True, blank=True, editable=False)
+
+    objects = ClienteQuerySet.as_manager()
 
     class Meta:
         ordering = ["nombre"]
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        indexes = [
+            models.Index(fields=["citas_no_asistidas"], name="cliente_inasistencias_idx"),
+            models.Index(fields=["ultima_visita"], name="cliente_ultima_visita_idx"),
+        ]
 
     def __str__(self):
         return f"{self.nombre} - {self.telefono}"
 
+    @property
+    def tasa_asistencia(self):
+        """Porcentaje de asistencia sobre las citas con registro."""
+        registradas = self.citas_asistidas + self.citas_no_asistidas
+        if not registradas:
+            return None
+        return round(self.citas_asistidas / registradas * 100, 1)
+
     def telefono_limpio(self):
         """Retorna el teléfono solo con dígitos para WhatsApp."""
         return "".join(filter(str.isdigit, self.telefono))
@@ -44,12 +229,110 @@ class Cliente(models.Model):
             if len(telefono_limpio) < 10:
                 raise ValidationError({"telefono": "El teléfono debe tener al menos 10 dígitos."})
     
+    # Campos que solo se escriben con UPDATE por conjunto (contadores y
+    # borrado lógico); guardar una instancia vieja no debe pisarlos
+    CAMPOS_CALCULADOS = CAMPOS_CONTADORES + ("ultima_visita", "proxima_cita", "eliminado")
+
     def save(self, *args, **kwargs):
         """Override save para ejecutar validaciones."""
         self.full_clean()
+        self.nombre_busqueda = normalizar_nombre(self.nombre)
+        self.telefono_normalizado = normalizar_telefono(self.telefono)
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                campo.name
+                for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_CALCULADOS
+            ]
         super().save(*args, **kwargs)
 
 
+class CitaQuerySet(models.QuerySet):
+    """Operaciones por conjunto sobre citas."""
+
+    def cambiar_estado(self, estado):
+        """
+        Cambia el estado de las citas abiertas en un solo UPDATE. Al cancelar
+        libera sus franjas y recalcula los contadores de los clientes
+        afectados en la misma transacción. Retorna las citas modificadas.
+        """
+        abiertas = self.filter(estado__in=ESTADOS_ABIERTOS).exclude(estado=estado)
+        with transaccion_reserva():
+            if estado == "cancelada":
+                OcupacionFranja.objects.liberar(abiertas.values_list("fecha", "hora"))
+                clientes = list(abiertas.order_by().values_list("cliente_id", flat=True).distinct())
+            total = abiertas.update(estado=estado, actualizado=timezone.now())
+            if estado == "cancelada":
+                Cliente.objects.filter(pk__in=clientes).recalcular_contadores()
+        return total
+
+    def desplazar(self, delta):
+        """
+        Mueve las citas `delta` (timedelta) con un UPDATE por lotes. Mueve sus
+        franjas y recalcula los contadores de los clientes afectados en la
+        misma transacción; lanza FranjaLlena si alguna franja nueva no tiene
+        lugar. Retorna las citas movidas.
+        """
+        ahora = timezone.now()
+        with transaccion_reserva():
+            citas = list(
+                self.order_by().only(
+                    "pk", "cliente_id", "fecha", "hora", "estado", "token_confirmacion"
+                )
+            )
+            previas = [(c.fecha, c.hora) for c in citas if c.estado != "cancelada"]
+            for cita in citas:
+                momento = datetime.combine(cita.fecha, cita.hora) + delta
+                if momento.date() != cita.fecha:
+                    # Igual que Cita.save: los enlaces enviados vencían en la fecha anterior
+                    cita.token_confirmacion = uuid.uuid4()
+                cita.fecha, cita.hora, cita.actualizado = momento.date(), momento.time(), ahora
+            OcupacionFranja.objects.liberar(previas)
+            OcupacionFranja.objects.reservar(
+                [(c.fecha, c.hora) for c in citas if c.estado != "cancelada"]
+            )
+            Cita.objects.bulk_update(
+                citas, ["fecha", "hora", "actualizado", "token_confirmacion"], batch_size=500
+            )
+            Cliente.objects.filter(pk__in={c.cliente_id for c in citas}).recalcular_contadores()
+        return len(citas)
+
+    def rotar_tokens(self, lote=500):
+        """
+        Regenera `token_confirmacion`, lo que invalida los enlaces enviados,
+        con un UPDATE por cada `lote` citas. Retorna las citas modificadas.
+        """
+        ahora = timezone.now()
+        pks = list(self.order_by().values_list("pk", flat=True))
+        for inicio in range(0, len(pks), lote):
+            Cita.objects.bulk_update(
+                [
+                    Cita(pk=pk, token_confirmacion=uuid.uuid4(), actualizado=ahora)
+                    for pk in pks[inicio:inicio + lote]
+                ],
+                ["token_confirmacion", "actualizado"],
+            )
+        return len(pks)
+
+    def eliminar(self):
+        """
+        Elimina las citas, libera sus franjas y recalcula los contadores de
+        los clientes afectados en una transacción. Retorna las citas
+        eliminadas.
+
+        Usa QuerySet.delete() y no Cita.delete, así que franjas y contadores
+        se ajustan aquí en bloque. Como hay receptores de post_delete, Django
+        carga las filas para enviar las señales antes del DELETE.
+        """
+        with transaccion_reserva():
+            franjas = list(self.exclude(estado="cancelada").values_list("fecha", "hora"))
+            clientes = list(self.order_by().values_list("cliente_id", flat=True).distinct())
+            total = self.order_by().delete()[0]
+            OcupacionFranja.objects.liberar(franjas)
+            Cliente.objects.filter(pk__in=clientes).recalcular_contadores()
+        return total
+
+
 class Cita(models.Model):
     """Modelo para gestionar citas."""
 
@@ -84,17 +367,110 @@ class Cita(models.Model):
     )
     asistio = models.BooleanField("¿Asistió?", null=True, blank=True, default=None)
     notas = models.TextField("Notas adicionales", blank=True, null=True)
+    riesgo_inasistencia = models.FloatField(
+        "Riesgo de inasistencia", null=True, blank=True, editable=False
+    )
+    serie = models.ForeignKey(
+        "SerieCita",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="citas",
+        verbose_name="Serie",
+    )
     creado = models.DateTimeField("Fecha de creación", auto_now_add=True)
     actualizado = models.DateTimeField("Última actualización", auto_now=True)
 
+    objects = CitaQuerySet.as_manager()
+
     class Meta:
         ordering = ["-fecha", "-hora"]
         verbose_name = "Cita"
         verbose_name_plural = "Citas"
+        indexes = [
+            models.Index(fields=["cliente", "fecha"], name="cita_cliente_fecha_idx"),
+            models.Index(fields=["fecha", "hora"], name="cita_fecha_hora_idx"),
+            models.Index(fields=["estado", "fecha"], name="cita_estado_fecha_idx"),
+            models.Index(fields=["asistio", "fecha"], name="cita_asistio_fecha_idx"),
+            models.Index(fields=["actualizado"], name="cita_actualizado_idx"),
+        ]
 
     def __str__(self):
         return f"{self.cliente.nombre} - {self.fecha} {self.hora}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda la huella original para calcular deltas de contadores."""
+        instancia = super().from_db(db, field_names, values)
+        cargados = dict(zip(field_names, values))
+        if {"cliente_id", "estado", "asistio"} <= cargados.keys():
+            instancia._huella_previa = (
+                cargados["cliente_id"], cargados["estado"], cargados["asistio"]
+            )
+        if {"fecha", "hora", "estado"} <= cargados.keys():
+            instancia._franja_previa = instancia._franja()
+        if "fecha" in cargados:
+            instancia._fecha_previa = cargados["fecha"]
+        return instancia
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None:
+            self._huella_previa = self._huella()
+            self._franja_previa = self._franja()
+            self._fecha_previa = self.fecha
+
+    def _huella(self):
+        return (self.cliente_id, self.estado, self.asistio)
+
+    def _franja(self):
+        """Franja (fecha, inicio) que ocupa la cita; las canceladas no ocupan."""
+        if self.estado == "cancelada":
+            return None
+        return (self.fecha, franja_de(self.hora))
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda la cita, mueve su reserva de franja y actualiza los contadores
+        del cliente en la misma transacción. Si cambia la fecha, regenera
+        `token_confirmacion`. Lanza FranjaLlena si la nueva franja no tiene
+        lugar.
+        """
+        previo = getattr(self, "_huella_previa", None) if self.pk else None
+        franja_previa = getattr(self, "_franja_previa", None) if self.pk else None
+        fecha_previa = getattr(self, "_fecha_previa", None) if self.pk else None
+        if fecha_previa and self.fecha != fecha_previa:
+            # Los enlaces enviados vencían en la fecha anterior: se revocan
+            self.token_confirmacion = uuid.uuid4()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = [*kwargs["update_fields"], "token_confirmacion"]
+        with transaccion_reserva():
+            franja = self._franja()
+            if franja != franja_previa:
+                if franja_previa:
+                    OcupacionFranja.objects.liberar([franja_previa])
+                if franja:
+                    OcupacionFranja.objects.reservar([franja])
+            super().save(*args, **kwargs)
+            Cliente.objects.registrar_cambio(previo, self._huella())
+        self._huella_previa = self._huella()
+        self._franja_previa = self._franja()
+        self._fecha_previa = self.fecha
+
+    def delete(self, *args, **kwargs):
+        """Elimina la cita, libera su franja y descuenta sus contadores."""
+        previo = getattr(self, "_huella_previa", None) or self._huella()
+        franja = getattr(self, "_franja_previa", None) or self._franja()
+        with transaccion_reserva():
+            resultado = super().delete(*args, **kwargs)
+            if franja:
+                OcupacionFranja.objects.liberar([franja])
+            Cliente.objects.registrar_cambio(previo, None)
+        self._huella_previa = None
+        self._franja_previa = None
+        return resultado
+
     @property
     def es_pasada(self):
         """Verifica si la cita ya pasó."""
@@ -140,9 +516,21 @@ class Cita(models.Model):
         if self.estado == "no_asistio" and self.asistio is not False:
             raise ValidationError("El estado 'no asistió' requiere que asistio sea False.")
 
+        # Verificar que quede lugar en la franja (la reserva definitiva se hace al guardar)
+        franja = self._franja() if self.fecha and self.hora else None
+        previa = getattr(self, "_franja_previa", None) if self.pk else None
+        if franja and OcupacionFranja.objects.llenas([franja], excluir=[previa] if previa else []):
+            raise ValidationError(
+                f"No hay lugar disponible el {self.fecha.strftime('%d/%m/%Y')} a las {self.hora.strftime('%H:%M')}. La agenda ya está llena en ese horario."
+            )
+
+    def url_confirmacion(self, base_url=""):
+        """Enlace corto y firmado para la confirmación pública."""
+        return base_url + reverse("cita_confirmar_corto", args=[generar_token(self)])
+
     def generar_mensaje_whatsapp(self, base_url=""):
         """Genera el mensaje para enviar por WhatsApp."""
-        url_confirmacion = f"{base_url}/citas/confirmar/{self.token_confirmacion}/"
+        url_confirmacion = self.url_confirmacion(base_url)
         mensaje = (
             f"*Confirmacion de Cita*\n\n"
             f"Hola *{self.cliente.nombre}*,\n\n"
@@ -165,3 +553,338 @@ class Cita(models.Model):
         telefono = self.cliente.telefono_limpio()
         mensaje_encoded = urllib.parse.quote(mensaje)
         return f"https://wa.me/{telefono}?text={mensaje_encoded}"
+
+
+def _sumar_meses(fecha, meses):
+    """Suma meses conservando el día; se ajusta al último día si no existe."""
+    indice = fecha.month - 1 + meses
+    anio, mes = fecha.year + indice // 12, indice % 12 + 1
+    return fecha.replace(year=anio, month=mes, day=min(fecha.day, calendar.monthrange(anio, mes)[1]))
+
+
+class SerieCita(models.Model):
+    """Regla de repetición con la que se generaron varias citas de un cliente."""
+
+    UNIDAD_CHOICES = [
+        ("dias", "Días"),
+        ("semanas", "Semanas"),
+        ("meses", "Meses"),
+    ]
+    DIA_SEMANA_CHOICES = [
+        (0, "Lunes"),
+        (1, "Martes"),
+        (2, "Miércoles"),
+        (3, "Jueves"),
+        (4, "Viernes"),
+        (5, "Sábado"),
+        (6, "Domingo"),
+    ]
+
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name="series",
+        verbose_name="Cliente",
+    )
+    hora = models.TimeField("Hora de las citas")
+    motivo = models.CharField("Motivo", max_length=300)
+    notas = models.TextField("Notas adicionales", blank=True, null=True)
+    intervalo = models.PositiveSmallIntegerField("Repetir cada", default=1)
+    unidad = models.CharField(
+        "Unidad", max_length=10, choices=UNIDAD_CHOICES, default="semanas"
+    )
+    dia_semana = models.PositiveSmallIntegerField(
+        "Día de la semana", choices=DIA_SEMANA_CHOICES, null=True, blank=True
+    )
+    fecha_inicio = models.DateField("Primera fecha")
+    fecha_fin = models.DateField("Repetir hasta", null=True, blank=True)
+    repeticiones = models.PositiveSmallIntegerField(
+        "Número de citas", null=True, blank=True
+    )
+    creado = models.DateTimeField("Fecha de creación", auto_now_add=True)
+
+    class Meta:
+        ordering = ["-creado"]
+        verbose_name = "Serie de citas"
+        verbose_name_plural = "Series de citas"
+
+    def __str__(self):
+        return f"{self.cliente.nombre} - cada {self.intervalo} {self.get_unidad_display().lower()}"
+
+    def generar_fechas(self, limite=None):
+        """
+        Fechas de las citas de la serie. Termina en `fecha_fin`, al llegar a
+        `repeticiones` o en `limite`, lo que ocurra primero.
+        """
+        fin = min((f for f in (self.fecha_fin, limite) if f), default=None)
+        if not fin and not self.repeticiones:
+            raise ValueError("La serie necesita una fecha final o un número de citas.")
+
+        primera = self.fecha_inicio
+        if self.unidad == "semanas" and self.dia_semana is not None:
+            primera += timedelta(days=(self.dia_semana - primera.weekday()) % 7)
+        dias_por_paso = 7 if self.unidad == "semanas" else 1
+
+        fechas = []
+        while not self.repeticiones or len(fechas) < self.repeticiones:
+            pasos = len(fechas) * self.intervalo
+            if self.unidad == "meses":
+                fecha = _sumar_meses(primera, pasos)
+            else:
+                fecha = primera + timedelta(days=pasos * dias_por_paso)
+            if fin and fecha > fin:
+                break
+            fechas.append(fecha)
+        return fechas
+
+
+class FranjaLlena(ValidationError):
+    """No queda lugar en una o más franjas de la agenda."""
+
+    def __init__(self, franjas):
+        self.franjas = franjas
+        listado = ", ".join(
+            f"{fecha.strftime('%d/%m/%Y')} {hora.strftime('%H:%M')}" for fecha, hora in franjas[:5]
+        )
+        if len(franjas) > 5:
+            listado += f" y {len(franjas) - 5} más"
+        super().__init__(f"No hay lugar disponible en: {listado}.")
+
+
+def franja_de(hora):
+    """Inicio de la franja de MINUTOS_POR_FRANJA que contiene `hora`."""
+    minutos = hora.hour * 60 + hora.minute
+    minutos -= minutos % settings.MINUTOS_POR_FRANJA
+    return time(minutos // 60, minutos % 60)
+
+
+class OcupacionFranjaQuerySet(models.QuerySet):
+    """
+    Reserva y liberación de lugares por franja. Todas las operaciones
+    reciben pares (fecha, hora) y los agrupan por franja.
+    """
+
+    def _por_franja(self, pares):
+        return Counter((fecha, franja_de(hora)) for fecha, hora in pares)
+
+    def _filas(self, franjas):
+        """Filas de las franjas indicadas, indexadas por (fecha, hora)."""
+        if not franjas:
+            return {}
+        filas = self.filter(
+            fecha__in={fecha for fecha, _ in franjas},
+            hora__in={hora for _, hora in franjas},
+        )
+        return {(f.fecha, f.hora): f for f in filas if (f.fecha, f.hora) in franjas}
+
+    def _sumar(self, filas_por_cantidad, signo):
+        """Un UPDATE por cada cantidad distinta (normalmente uno solo)."""
+        for cantidad, ids in filas_por_cantidad.items():
+            self.filter(pk__in=ids).update(
+                ocupadas=Greatest(F("ocupadas") + signo * cantidad, 0)
+            )
+
+    def llenas(self, pares, excluir=()):
+        """
+        Franjas de `pares` sin lugar suficiente. `excluir` son pares que ya
+        ocupan su franja (la cita que se está editando).
+        """
+        necesarias = self._por_franja(pares)
+        necesarias.subtract(self._por_franja(excluir))
+        filas = self._filas(necesarias.keys())
+        return sorted(
+            franja
+            for franja, cantidad in necesarias.items()
+            if cantidad > 0 and franja in filas
+            and filas[franja].ocupadas + cantidad > filas[franja].capacidad
+        )
+
+    def reservar(self, pares):
+        """
+        Ocupa un lugar por cada par. Debe llamarse dentro de
+        `transaccion_reserva()`: las filas se bloquean con select_for_update
+        antes de comprobar la capacidad. Lanza FranjaLlena sin modificar nada
+        si alguna franja no alcanza.
+        """
+        necesarias = self._por_franja(pares)
+        self.bulk_create(
+            [
+                OcupacionFranja(fecha=fecha, hora=hora, capacidad=settings.CAPACIDAD_FRANJA)
+                for fecha, hora in necesarias
+            ],
+            ignore_conflicts=True,
+        )
+        filas = self.select_for_update()._filas(necesarias.keys())
+        llenas = sorted(
+            franja for franja, cantidad in necesarias.items()
+            if filas[franja].ocupadas + cantidad > filas[franja].capacidad
+        )
+        if llenas:
+            raise FranjaLlena(llenas)
+
+        por_cantidad = {}
+        for franja, cantidad in necesarias.items():
+            por_cantidad.setdefault(cantidad, []).append(filas[franja].pk)
+        self._sumar(por_cantidad, 1)
+
+    def liberar(self, pares):
+        """Devuelve un lugar por cada par."""
+        liberadas = self._por_franja(pares)
+        filas = self._filas(liberadas.keys())
+        por_cantidad = {}
+        for franja, cantidad in liberadas.items():
+            if franja in filas:
+                por_cantidad.setdefault(cantidad, []).append(filas[franja].pk)
+        self._sumar(por_cantidad, -1)
+
+    def recalcular(self, desde=None):
+        """
+        Recalcula la ocupación desde las citas a partir de `desde` (hoy por
+        defecto). Conserva la capacidad configurada en cada fila.
+        """
+        desde = desde or timezone.localdate()
+        conteos = self._por_franja(
+            Cita.objects.filter(fecha__gte=desde)
+            .exclude(estado="cancelada")
+            .order_by()
+            .values_list("fecha", "hora")
+            .iterator(chunk_size=5000)
+        )
+        with transaction.atomic():
+            filas = list(self.filter(fecha__gte=desde))
+            for fila in filas:
+                fila.ocupadas = conteos.pop((fila.fecha, fila.hora), 0)
+            self.bulk_update(filas, ["ocupadas"], batch_size=500)
+            self.bulk_create(
+                [
+                    OcupacionFranja(
+                        fecha=fecha, hora=hora, ocupadas=ocupadas,
+                        capacidad=settings.CAPACIDAD_FRANJA,
+                    )
+                    for (fecha, hora), ocupadas in conteos.items()
+                ],
+                batch_size=500,
+            )
+        return len(filas) + len(conteos)
+
+
+class OcupacionFranja(models.Model):
+    """Lugares ocupados de una franja de la agenda (fecha + hora de inicio)."""
+
+    fecha = models.DateField("Fecha")
+    hora = models.TimeField("Inicio de la franja")
+    ocupadas = models.PositiveSmallIntegerField("Citas", default=0)
+    capacidad = models.PositiveSmallIntegerField("Capacidad")
+
+    objects = OcupacionFranjaQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["fecha", "hora"]
+        verbose_name = "Ocupación de franja"
+        verbose_name_plural = "Ocupación de franjas"
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "hora"], name="franja_unica"),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.hora:%H:%M} ({self.ocupadas}/{self.capacidad})"
+
+
+class PosibleDuplicado(models.Model):
+    """Par de clientes que podrían ser la misma persona, pendiente de revisión."""
+
+    ESTADO_CHOICES = [
+        ("pendiente", "Pendiente"),
+        ("fusionado", "Fusionado"),
+        ("descartado", "Descartado"),
+    ]
+
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Cliente",
+    )
+    duplicado = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Posible duplicado",
+    )
+    puntaje = models.FloatField("Similitud")
+    motivos = models.CharField("Coincidencias", max_length=100)
+    estado = models.CharField(
+        "Estado", max_length=20, choices=ESTADO_CHOICES, default="pendiente"
+    )
+    creado = models.DateTimeField("Fecha de detección", auto_now_add=True)
+    revisado = models.DateTimeField("Fecha de revisión", null=True, blank=True)
+
+    class Meta:
+        ordering = ["-puntaje"]
+        verbose_name = "Posible duplicado"
+        verbose_name_plural = "Posibles duplicados"
+        constraints = [
+            models.UniqueConstraint(fields=["cliente", "duplicado"], name="duplicado_par_unico"),
+        ]
+        indexes = [
+            models.Index(fields=["estado", "puntaje"], name="duplicado_revision_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.cliente} ~ {self.duplicado} ({self.puntaje:.2f})"
+
+
+class Tarea(models.Model):
+    """Trabajo en segundo plano ejecutado por `manage.py procesar_tareas`."""
+
+    ESTADO_CHOICES = [
+        ("pendiente", "Pendiente"),
+        ("en_proceso", "En proceso"),
+        ("completada", "Completada"),
+        ("fallida", "Fallida"),
+    ]
+
+    nombre = models.CharField("Tarea", max_length=100)
+    argumentos = models.JSONField("Argumentos", default=dict, blank=True)
+    estado = models.CharField(
+        "Estado", max_length=20, choices=ESTADO_CHOICES, default="pendiente"
+    )
+    progreso = models.PositiveSmallIntegerField("Progreso (%)", default=0)
+    mensaje = models.CharField("Mensaje", max_length=300, blank=True)
+    resultado = models.JSONField("Resultado", null=True, blank=True)
+    error = models.TextField("Error", blank=True)
+    intentos = models.PositiveSmallIntegerField("Intentos", default=0)
+    max_intentos = models.PositiveSmallIntegerField("Máximo de intentos", default=3)
+    ejecutar_despues = models.DateTimeField("Ejecutar a partir de", default=timezone.now)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="tareas",
+        verbose_name="Solicitada por",
+    )
+    iniciado = models.DateTimeField("Inicio", null=True, blank=True)
+    terminado = models.DateTimeField("Fin", null=True, blank=True)
+    creado = models.DateTimeField("Fecha de creación", auto_now_add=True)
+    actualizado = models.DateTimeField("Última actualización", auto_now=True)
+
+    class Meta:
+        ordering = ["-creado"]
+        verbose_name = "Tarea en segundo plano"
+        verbose_name_plural = "Tareas en segundo plano"
+        indexes = [
+            models.Index(fields=["estado", "ejecutar_despues"], name="tarea_cola_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} ({self.get_estado_display()})"
+
+    def reportar_progreso(self, progreso, mensaje=""):
+        """Actualiza el avance visible para la vista de estado."""
+        self.progreso = max(0, min(100, int(progreso)))
+        self.mensaje = mensaje[:300]
+        Tarea.objects.filter(pk=self.pk).update(
+            progreso=self.progreso, mensaje=self.mensaje, actualizado=timezone.now()
+        )
+
@@ -0,0 +1,19 @@
+"""Normalización de nombres y teléfonos para búsquedas y comparaciones."""
+import re
+import unicodedata
+
+
+def quitar_acentos(texto):
+    """Elimina acentos y diacríticos (á → a, ñ → n, ü → u)."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def normalizar_nombre(nombre):
+    """Minúsculas, sin acentos y con espacios simples."""
+    return " ".join(quitar_acentos(nombre or "").lower().split())
+
+
+def normalizar_telefono(telefono):
+    """Solo los dígitos del teléfono."""
+    return re.sub(r"\D", "", telefono or "")
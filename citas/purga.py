@@ -0,0 +1,68 @@
+"""
+Purga física de clientes eliminados lógicamente.
+
+Se evita el recolector de `on_delete=CASCADE` (que carga cada cita en
+memoria) usando DELETE directos por lotes de llaves primarias. Cada lote
+corre en su propia transacción para no retener el bloqueo de escritura.
+Como el DELETE directo no aplica los CASCADE de Django ni Cita.delete, las
+filas que apuntan a los clientes se borran antes y las franjas de las citas
+se liberan, en la misma transacción del lote.
+"""
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Cita, Cliente, OcupacionFranja, PosibleDuplicado, SerieCita
+from .transacciones import transaccion_reserva
+
+TAMANO_LOTE = 500
+
+
+def _borrar_por_lotes(queryset, lote, antes=None):
+    """
+    Borra las filas del queryset en lotes de `lote` llaves primarias.
+    `antes(pks)` se ejecuta dentro de la transacción de cada lote, antes
+    del DELETE.
+    """
+    modelo = queryset.model
+    tabla = connection.ops.quote_name(modelo._meta.db_table)
+    columna = connection.ops.quote_name(modelo._meta.pk.column)
+    total = 0
+    while True:
+        pks = list(queryset.order_by().values_list("pk", flat=True)[:lote])
+        if not pks:
+            return total
+        marcadores = ", ".join(["%s"] * len(pks))
+        with transaccion_reserva():
+            if antes:
+                antes(pks)
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {tabla} WHERE {columna} IN ({marcadores})", pks)
+        total += len(pks)
+
+
+def _liberar_franjas(pks):
+    OcupacionFranja.objects.liberar(
+        Cita.objects.filter(pk__in=pks).exclude(estado="cancelada").values_list("fecha", "hora")
+    )
+
+
+def _borrar_pares_duplicados(pks):
+    PosibleDuplicado.objects.filter(Q(cliente__in=pks) | Q(duplicado__in=pks)).delete()
+
+
+def purgar_clientes(antes_de=None, lote=TAMANO_LOTE):
+    """
+    Elimina físicamente los clientes marcados como eliminados antes de
+    `antes_de` (por defecto, ahora) junto con sus citas y series.
+
+    Retorna una tupla (clientes_borrados, citas_borradas).
+    """
+    antes_de = antes_de or timezone.now()
+    clientes = Cliente.objects.filter(eliminado__lte=antes_de)
+    citas = _borrar_por_lotes(
+        Cita.objects.filter(cliente__in=clientes), lote, antes=_liberar_franjas
+    )
+    # Cita.serie es SET_NULL: las series se borran después de sus citas
+    _borrar_por_lotes(SerieCita.objects.filter(cliente__in=clientes), lote)
+    return _borrar_por_lotes(clientes, lote, antes=_borrar_pares_duplicados), citas
@@ -0,0 +1,92 @@
+"""
+Enrutamiento de lecturas pesadas (reportes, exportaciones, analítica) a la
+base de datos `replica`.
+
+- Las vistas marcadas con `@lectura_replica` leen de `replica`.
+- Cualquier escritura dentro de la petición fija el resto de la petición a
+  la primaria.
+- Tras un POST/PUT/DELETE, `ReplicaMiddleware` deja una cookie que fija al
+  usuario a la primaria durante REPLICA_STICKY_SECONDS, para que vea sus
+  propios cambios aunque la réplica todavía no los tenga.
+
+Si no hay alias `replica` configurado (o su archivo aún no existe) todo va
+a `default`.
+"""
+import os
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+ALIAS_REPLICA = "replica"
+COOKIE_PRIMARIA = "usar_primaria"
+METODOS_SEGUROS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+_leer_replica = ContextVar("leer_replica", default=False)
+_fijar_primaria = ContextVar("fijar_primaria", default=False)
+
+
+def replica_disponible():
+    config = settings.DATABASES.get(ALIAS_REPLICA)
+    if not config:
+        return False
+    instantanea = getattr(settings, "REPLICA_SNAPSHOT_PATH", None)
+    return instantanea is None or os.path.exists(instantanea)
+
+
+class ReplicaRouter:
+    """Router que envía a `replica` las lecturas de las vistas marcadas."""
+
+    def db_for_read(self, model, **hints):
+        if _leer_replica.get() and not _fijar_primaria.get() and replica_disponible():
+            return ALIAS_REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        _fijar_primaria.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != ALIAS_REPLICA
+
+
+def lectura_replica(vista):
+    """Marca una vista de solo lectura para que sus consultas usen la réplica."""
+
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        token = _leer_replica.set(request.method in METODOS_SEGUROS)
+        try:
+            return vista(request, *args, **kwargs)
+        finally:
+            _leer_replica.reset(token)
+
+    return envoltura
+
+
+class ReplicaMiddleware:
+    """Aplica la fijación a la primaria por cookie y la renueva tras escribir."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _fijar_primaria.set(COOKIE_PRIMARIA in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _fijar_primaria.reset(token)
+
+        if request.method not in METODOS_SEGUROS:
+            response.set_cookie(
+                COOKIE_PRIMARIA,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+                secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return response
@@ -0,0 +1,47 @@
+"""
+Resumen cacheado del dashboard.
+
+Los contadores del dashboard se calculan con varias consultas COUNT; se
+guardan en la caché por unos segundos y se invalidan al guardar o
+eliminar citas y clientes. Las operaciones masivas con update() no envían
+señales, así que llaman a `invalidar_resumen()` por su cuenta.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Cita, Cliente
+
+RESUMEN_CACHE_TTL = 60
+
+
+def _clave(hoy):
+    return f"dashboard:resumen:{hoy.isoformat()}"
+
+
+def resumen_dashboard(hoy=None):
+    """Contadores del dashboard para el día `hoy`."""
+    hoy = hoy or timezone.now().date()
+    clave = _clave(hoy)
+    resumen = cache.get(clave)
+    if resumen is None:
+        resumen = {
+            "citas_pendientes": Cita.objects.filter(estado="pendiente").count(),
+            "citas_confirmadas": Cita.objects.filter(estado="confirmada", fecha__gte=hoy).count(),
+            "total_clientes": Cliente.objects.filter(activo=True).count(),
+        }
+        cache.set(clave, resumen, RESUMEN_CACHE_TTL)
+    return resumen
+
+
+def invalidar_resumen():
+    cache.delete(_clave(timezone.now().date()))
+
+
+@receiver(post_save, sender=Cita)
+@receiver(post_delete, sender=Cita)
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+def _datos_modificados(sender, **kwargs):
+    invalidar_resumen()
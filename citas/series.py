@@ -0,0 +1,144 @@
+"""
+Series de citas recurrentes.
+
+Las fechas de una serie se validan contra las citas existentes del cliente
+con una sola consulta por rango y una comparación vectorizada en memoria;
+luego se crean con `bulk_create` en una transacción. Los cambios a "esta y
+las siguientes" son un único UPDATE.
+"""
+import numpy as np
+from django.utils import timezone
+
+from .models import Cita, Cliente, ESTADOS_CERRADOS, OcupacionFranja
+from .resumen import invalidar_resumen
+from .transacciones import transaccion_reserva
+
+# Mismo margen que CitaForm entre dos citas del mismo cliente
+MARGEN_MINUTOS = 30
+
+
+def _minutos(fechas, horas):
+    """Minutos absolutos (ordinal del día × 1440 + minuto del día)."""
+    dias = np.fromiter((f.toordinal() for f in fechas), dtype=np.int64, count=len(fechas))
+    minutos = np.fromiter(
+        (h.hour * 60 + h.minute for h in horas), dtype=np.int64, count=len(fechas)
+    )
+    return dias * 1440 + minutos
+
+
+def conflictos(cliente_id, fechas, hora, excluir=None):
+    """
+    Fechas de `fechas` en las que el cliente ya tiene una cita a menos de
+    MARGEN_MINUTOS de `hora`. `excluir` es un queryset de citas a ignorar
+    (por ejemplo, las mismas citas de la serie al editarla).
+    """
+    if not fechas:
+        return []
+    existentes = Cita.objects.filter(
+        cliente_id=cliente_id, fecha__gte=min(fechas), fecha__lte=max(fechas)
+    ).exclude(estado="cancelada")
+    if excluir is not None:
+        existentes = existentes.exclude(pk__in=excluir.values("pk"))
+    filas = list(existentes.order_by().values_list("fecha", "hora"))
+    if not filas:
+        return []
+
+    ocupados = np.sort(_minutos(*zip(*filas)))
+    nuevos = _minutos(fechas, [hora] * len(fechas))
+    # Citas existentes dentro de [nueva - margen, nueva + margen)
+    desde = np.searchsorted(ocupados, nuevos - MARGEN_MINUTOS, side="left")
+    hasta = np.searchsorted(ocupados, nuevos + MARGEN_MINUTOS, side="left")
+    return [fecha for fecha, choca in zip(fechas, hasta > desde) if choca]
+
+
+def conflictos_varios(nuevas, excluir):
+    """
+    Elementos de `nuevas` (tuplas cliente_id, fecha, hora) que quedan a menos
+    de MARGEN_MINUTOS de otra cita de su cliente. `excluir` es un queryset de
+    citas a ignorar. Una sola consulta para todos los clientes.
+    """
+    if not nuevas:
+        return []
+    clientes, fechas, horas = zip(*nuevas)
+    existentes = (
+        Cita.objects.filter(
+            cliente_id__in=set(clientes), fecha__gte=min(fechas), fecha__lte=max(fechas)
+        )
+        .exclude(estado="cancelada")
+        .exclude(pk__in=excluir.values("pk"))
+    )
+    filas = list(existentes.order_by().values_list("cliente_id", "fecha", "hora"))
+    if not filas:
+        return []
+
+    # Cliente en los dígitos altos: el margen nunca cruza de un cliente a otro
+    base = 10**10
+    c_existentes, f_existentes, h_existentes = zip(*filas)
+    ocupados = np.sort(
+        np.array(c_existentes, dtype=np.int64) * base + _minutos(f_existentes, h_existentes)
+    )
+    claves = np.array(clientes, dtype=np.int64) * base + _minutos(fechas, horas)
+    desde = np.searchsorted(ocupados, claves - MARGEN_MINUTOS, side="left")
+    hasta = np.searchsorted(ocupados, claves + MARGEN_MINUTOS, side="left")
+    return [nueva for nueva, choca in zip(nuevas, hasta > desde) if choca]
+
+
+def crear_serie(serie, fechas):
+    """
+    Guarda la serie, reserva sus franjas y crea todas sus citas. Retorna las
+    citas creadas; lanza FranjaLlena si alguna franja se llenó entretanto.
+    """
+    with transaccion_reserva():
+        OcupacionFranja.objects.reservar([(fecha, serie.hora) for fecha in fechas])
+        serie.save()
+        citas = Cita.objects.bulk_create(
+            [
+                Cita(
+                    cliente_id=serie.cliente_id,
+                    serie=serie,
+                    fecha=fecha,
+                    hora=serie.hora,
+                    motivo=serie.motivo,
+                    notas=serie.notas,
+                )
+                for fecha in fechas
+            ],
+            batch_size=500,
+        )
+        Cliente.objects.filter(pk=serie.cliente_id).recalcular_contadores()
+    invalidar_resumen()
+    return citas
+
+
+def siguientes(cita):
+    """Citas abiertas de la serie de `cita` desde su fecha en adelante."""
+    return Cita.objects.filter(
+        serie_id=cita.serie_id, fecha__gte=cita.fecha
+    ).exclude(estado__in=ESTADOS_CERRADOS)
+
+
+def actualizar_siguientes(cita, **cambios):
+    """
+    Aplica `cambios` a esta cita y las siguientes de su serie en un UPDATE.
+    Si cambia la hora o se cancelan, mueve o libera sus franjas en la misma
+    transacción.
+    """
+    citas = siguientes(cita)
+    with transaccion_reserva():
+        if "hora" in cambios or cambios.get("estado") == "cancelada":
+            actuales = list(citas.values_list("fecha", "hora"))
+            OcupacionFranja.objects.liberar(actuales)
+            if cambios.get("estado") != "cancelada":
+                OcupacionFranja.objects.reservar(
+                    [(fecha, cambios["hora"]) for fecha, _ in actuales]
+                )
+        total = citas.update(**cambios, actualizado=timezone.now())
+        if "estado" in cambios:
+            Cliente.objects.filter(pk=cita.cliente_id).recalcular_contadores()
+    invalidar_resumen()
+    return total
+
+
+def cancelar_siguientes(cita):
+    """Cancela esta cita y las siguientes de su serie."""
+    return actualizar_siguientes(cita, estado="cancelada")
@@ -0,0 +1,185 @@
+"""
+Cola de tareas en segundo plano respaldada por la base de datos.
+
+Las funciones se registran con `@tarea("nombre")`, se encolan con
+`encolar()` y las ejecuta `manage.py procesar_tareas` en un pool de hilos
+o procesos. No requiere ningún broker externo: basta con SQLite.
+"""
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import Tarea
+
+logger = logging.getLogger(__name__)
+
+REGISTRO = {}
+
+# Segundos de espera antes del reintento n: BASE_REINTENTO * 2 ** (n - 1)
+BASE_REINTENTO = 30
+# Segundos entre latidos de una tarea en curso (muy por debajo de --rescatar-minutos)
+LATIDO_SEGUNDOS = 60
+
+
+def tarea(nombre, descripcion=""):
+    """Registra una función como tarea. La función recibe la Tarea y sus argumentos."""
+
+    def registrar(funcion):
+        funcion.descripcion = descripcion or nombre
+        REGISTRO[nombre] = funcion
+        return funcion
+
+    return registrar
+
+
+def encolar(nombre, usuario=None, max_intentos=3, **argumentos):
+    """Crea una tarea pendiente y la devuelve."""
+    if nombre not in REGISTRO:
+        raise ValueError(f"Tarea desconocida: {nombre}")
+    return Tarea.objects.create(
+        nombre=nombre,
+        argumentos=argumentos,
+        usuario=usuario,
+        max_intentos=max_intentos,
+    )
+
+
+def reclamar_siguiente():
+    """
+    Toma la siguiente tarea lista para ejecutarse.
+
+    El reclamo es un UPDATE condicionado al estado, así que dos workers
+    nunca ejecutan la misma tarea aunque la base no soporte SELECT FOR UPDATE.
+    """
+    while True:
+        candidata = (
+            Tarea.objects.filter(estado="pendiente", ejecutar_despues__lte=timezone.now())
+            .order_by("ejecutar_despues", "pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if candidata is None:
+            return None
+        reclamada = Tarea.objects.filter(pk=candidata, estado="pendiente").update(
+            estado="en_proceso", iniciado=timezone.now(), actualizado=timezone.now()
+        )
+        if reclamada:
+            return candidata
+
+
+def rescatar_abandonadas(minutos):
+    """
+    Devuelve a la cola las tareas 'en proceso' de un worker que murió: las
+    que llevan `minutos` sin latido ni progreso en `actualizado`.
+    """
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return Tarea.objects.filter(estado="en_proceso", actualizado__lt=limite).update(
+        estado="pendiente", ejecutar_despues=timezone.now()
+    )
+
+
+def _latir(tarea_pk, detener):
+    """Renueva `actualizado` mientras la tarea corre, aunque no reporte progreso."""
+    try:
+        while not detener.wait(LATIDO_SEGUNDOS):
+            try:
+                Tarea.objects.filter(pk=tarea_pk, estado="en_proceso").update(
+                    actualizado=timezone.now()
+                )
+            except DatabaseError:
+                logger.warning("No se pudo registrar el latido de la tarea %s", tarea_pk)
+    finally:
+        connections.close_all()
+
+
+def ejecutar(tarea_pk):
+    """Ejecuta una tarea reclamada y registra su resultado o el reintento."""
+    detener = threading.Event()
+    latido = threading.Thread(target=_latir, args=(tarea_pk, detener), daemon=True)
+    latido.start()
+    try:
+        tarea_obj = Tarea.objects.get(pk=tarea_pk)
+        funcion = REGISTRO.get(tarea_obj.nombre)
+        try:
+            if funcion is None:
+                raise LookupError(f"Tarea no registrada: {tarea_obj.nombre}")
+            resultado = funcion(tarea_obj, **tarea_obj.argumentos)
+        except Exception:
+            _registrar_fallo(tarea_obj, traceback.format_exc())
+        else:
+            Tarea.objects.filter(pk=tarea_pk).update(
+                estado="completada",
+                progreso=100,
+                mensaje="Completada.",
+                resultado=resultado,
+                intentos=tarea_obj.intentos + 1,
+                terminado=timezone.now(),
+                actualizado=timezone.now(),
+            )
+    finally:
+        detener.set()
+        latido.join()
+        # Cada hilo/proceso del pool abre sus propias conexiones
+        connections.close_all()
+
+
+def _registrar_fallo(tarea_obj, detalle):
+    intentos = tarea_obj.intentos + 1
+    cambios = {"intentos": intentos, "error": detalle, "actualizado": timezone.now()}
+    if intentos < tarea_obj.max_intentos:
+        espera = BASE_REINTENTO * 2 ** (intentos - 1)
+        cambios.update(
+            estado="pendiente",
+            ejecutar_despues=timezone.now() + timedelta(seconds=espera),
+            mensaje=f"Falló el intento {intentos}; reintento en {espera} s.",
+        )
+    else:
+        cambios.update(
+            estado="fallida",
+            terminado=timezone.now(),
+            mensaje=f"Falló tras {intentos} intento(s).",
+        )
+    logger.warning("Tarea %s (%s) falló:\n%s", tarea_obj.pk, tarea_obj.nombre, detalle)
+    Tarea.objects.filter(pk=tarea_obj.pk).update(**cambios)
+
+
+# ─── Tareas registradas ─────────────────────────────────────────────────────────
+
+
+@tarea("recalcular_contadores", "Recalcular contadores de asistencia")
+def _recalcular_contadores(tarea_obj):
+    from .models import Cliente
+
+    tarea_obj.reportar_progreso(10, "Recalculando contadores...")
+    return {"clientes": Cliente.objects.recalcular_contadores()}
+
+
+@tarea("calcular_riesgo", "Calcular riesgo de inasistencia")
+def _calcular_riesgo(tarea_obj):
+    from .riesgo import calcular_riesgos
+
+    tarea_obj.reportar_progreso(10, "Cargando historial...")
+    historicas, calificadas = calcular_riesgos()
+    return {"historicas": historicas, "calificadas": calificadas}
+
+
+@tarea("purgar_clientes", "Purgar clientes eliminados")
+def _purgar_clientes(tarea_obj, dias=0):
+    from .purga import purgar_clientes
+
+    tarea_obj.reportar_progreso(10, "Purgando clientes eliminados...")
+    clientes, citas = purgar_clientes(antes_de=timezone.now() - timedelta(days=dias))
+    return {"clientes": clientes, "citas": citas}
+
+
+@tarea("buscar_duplicados", "Buscar clientes duplicados")
+def _buscar_duplicados(tarea_obj):
+    from .duplicados import buscar_duplicados
+
+    tarea_obj.reportar_progreso(10, "Comparando clientes...")
+    comparados, encontrados = buscar_duplicados()
+    return {"comparados": comparados, "encontrados": encontrados}
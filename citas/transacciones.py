@@ -0,0 +1,36 @@
+"""
+Transacciones para reservar franjas de agenda.
+
+En PostgreSQL/MySQL basta con `transaction.atomic()` y `select_for_update`
+sobre la fila de la franja. SQLite ignora `select_for_update` y sus
+transacciones diferidas toman el bloqueo de escritura hasta la primera
+escritura, así que dos reservas simultáneas pueden leer la misma ocupación;
+por eso ahí la transacción externa se abre con `BEGIN IMMEDIATE`.
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+@contextmanager
+def transaccion_reserva(using=DEFAULT_DB_ALIAS):
+    """
+    `transaction.atomic()` que en SQLite toma el bloqueo de escritura al
+    iniciar (Django 4.2 no tiene OPTIONS["transaction_mode"]). Dentro de una
+    transacción ya abierta se comporta como un atomic anidado.
+    """
+    conexion = connections[using]
+    if conexion.vendor != "sqlite" or conexion.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    conexion.ensure_connection()
+    conexion._start_transaction_under_autocommit = lambda: conexion.cursor().execute(
+        "BEGIN IMMEDIATE"
+    )
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        del conexion._start_transaction_under_autocommit
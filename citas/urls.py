@@ -7,19 +7,34 @@ urlpatterns = [
     # Clientes
     path("clientes/", views.cliente_lista, name="cliente_lista"),
     path("clientes/nuevo/", views.cliente_crear, name="cliente_crear"),
+    path("clientes/acciones/", views.cliente_acciones, name="cliente_acciones"),
+    path("clientes/buscar/", views.cliente_buscar, name="cliente_buscar"),
+    path("clientes/duplicados/", views.duplicado_lista, name="duplicado_lista"),
+    path("clientes/duplicados/<int:pk>/", views.duplicado_accion, name="duplicado_accion"),
     path("clientes/<int:pk>/", views.cliente_detalle, name="cliente_detalle"),
     path("clientes/<int:pk>/editar/", views.cliente_editar, name="cliente_editar"),
     path("clientes/<int:pk>/eliminar/", views.cliente_eliminar, name="cliente_eliminar"),
     # Citas
     path("citas/", views.cita_lista, name="cita_lista"),
     path("citas/nueva/", views.cita_crear, name="cita_crear"),
+    path("citas/acciones/", views.cita_acciones, name="cita_acciones"),
+    path("citas/eventos/", views.cita_eventos, name="cita_eventos"),
+    path("citas/serie/nueva/", views.serie_crear, name="serie_crear"),
     path("citas/<int:pk>/", views.cita_detalle, name="cita_detalle"),
     path("citas/<int:pk>/editar/", views.cita_editar, name="cita_editar"),
     path("citas/<int:pk>/eliminar/", views.cita_eliminar, name="cita_eliminar"),
+    path("citas/<int:pk>/serie/editar/", views.cita_serie_editar, name="cita_serie_editar"),
+    path("citas/<int:pk>/serie/cancelar/", views.cita_serie_cancelar, name="cita_serie_cancelar"),
     path("citas/<int:pk>/whatsapp/", views.cita_whatsapp, name="cita_whatsapp"),
     path("citas/<int:pk>/asistencia/", views.registrar_asistencia, name="registrar_asistencia"),
     # Confirmación pública (sin login)
     path("citas/confirmar/<uuid:token>/", views.cita_confirmar, name="cita_confirmar"),
+    path("c/<str:token>/", views.cita_confirmar_corto, name="cita_confirmar_corto"),
     # Reportes
     path("reportes/asistencia/", views.reporte_asistencia, name="reporte_asistencia"),
+    path("reportes/ocupacion/", views.reporte_ocupacion, name="reporte_ocupacion"),
+    path("reportes/ocupacion.json", views.reporte_ocupacion_json, name="reporte_ocupacion_json"),
+    # Tareas en segundo plano
+    path("tareas/", views.tarea_lista, name="tarea_lista"),
+    path("tareas/<int:pk>/estado/", views.tarea_estado, name="tarea_estado"),
 ]
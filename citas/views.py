@@ -1,58 +1,154 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.core.cache import cache
+from urllib.parse import quote, urlencode
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Count, F, Q
+from django.urls import reverse
 from django.utils import timezone
 from datetime import datetime, timedelta
 
-from .models import Cliente, Cita
-from .forms import ClienteForm, CitaForm, AsistenciaForm, ReporteForm
+from . import duplicados, enlaces, eventos, series, tareas
+from .condicional import etag_condicional, sondeo, version
+from .models import Cliente, Cita, FranjaLlena, PosibleDuplicado, Tarea
+from .forms import (
+    ClienteForm, CitaForm, AsistenciaForm, ReporteForm, OcupacionForm,
+    SerieCitaForm, SerieEdicionForm, AccionCitasForm,
+)
+from .analitica import matriz_ocupacion, ocupacion
+from .decoradores import login_required_async
+from .replica import lectura_replica
+from .resumen import invalidar_resumen, resumen_dashboard
+
+
+# Citas con mayor riesgo de inasistencia primero; las no calificadas al final
+ORDEN_RIESGO = F("riesgo_inasistencia").desc(nulls_last=True)
 
 
 # ─── Dashboard ──────────────────────────────────────────────────────────────────
 
 
+def _sondeo_dashboard(request):
+    return (
+        version("riesgo"),
+        version("contadores"),
+        *sondeo(Cita.objects.all()),
+        *sondeo(Cliente.objects.all()),
+    )
+
+
 @login_required
+@etag_condicional(_sondeo_dashboard)
 def dashboard(request):
     """Vista principal con resumen del sistema."""
     hoy = timezone.now().date()
     citas_hoy = Cita.objects.filter(fecha=hoy).select_related("cliente")
-    citas_pendientes = Cita.objects.filter(estado="pendiente").count()
-    citas_confirmadas = Cita.objects.filter(estado="confirmada", fecha__gte=hoy).count()
-    total_clientes = Cliente.objects.filter(activo=True).count()
 
-    # Citas próximas (7 días)
+    # Citas próximas (7 días), opcionalmente priorizadas por riesgo de inasistencia
+    orden = request.GET.get("orden", "")
     proxima_semana = hoy + timedelta(days=7)
     citas_proximas = (
         Cita.objects.filter(fecha__gte=hoy, fecha__lte=proxima_semana)
         .exclude(estado__in=["cancelada", "completada", "no_asistio"])
         .select_related("cliente")
-        .order_by("fecha", "hora")[:10]
     )
+    if orden == "riesgo":
+        citas_proximas = citas_proximas.order_by(ORDEN_RIESGO, "fecha", "hora")[:10]
+    else:
+        citas_proximas = citas_proximas.order_by("fecha", "hora")[:10]
 
     context = {
         "citas_hoy": citas_hoy,
-        "citas_pendientes": citas_pendientes,
-        "citas_confirmadas": citas_confirmadas,
-        "total_clientes": total_clientes,
+        **resumen_dashboard(hoy),
         "citas_proximas": citas_proximas,
+        "orden": orden,
     }
     return render(request, "citas/dashboard.html", context)
 
 
+@login_required
+def cita_eventos(request):
+    """Cambios de estado de las citas como server-sent events (ver citas/eventos.py)."""
+    cursor = eventos.leer_cursor(request.headers.get("Last-Event-ID", ""))
+    cursor = cursor or eventos.cursor_actual()
+    if isinstance(request, ASGIRequest):
+        contenido = eventos.flujo(cursor)
+    else:
+        contenido = eventos.lote(cursor)
+    respuesta = StreamingHttpResponse(contenido, content_type="text/event-stream")
+    respuesta["Cache-Control"] = "no-cache"
+    # Sin búfer en nginx, para que cada evento llegue al momento
+    respuesta["X-Accel-Buffering"] = "no"
+    return respuesta
+
+
 # ─── CRUD Clientes ──────────────────────────────────────────────────────────────
 
 
+# Ordenamientos permitidos en la lista de clientes (respaldados por índices)
+ORDENES_CLIENTES = {
+    "nombre": ("nombre",),
+    "inasistencias": ("-citas_no_asistidas", "nombre"),
+    "ultima_visita": (F("ultima_visita").desc(nulls_last=True), "nombre"),
+}
+
+
+def _sondeo_cliente_lista(request):
+    # Los contadores de cada cliente cambian con sus citas
+    return (version("contadores"), *sondeo(Cliente.objects.all()), *sondeo(Cita.objects.all()))
+
+
 @login_required
+@etag_condicional(_sondeo_cliente_lista)
 def cliente_lista(request):
     """Lista de todos los clientes."""
     q = request.GET.get("q", "")
-    clientes = Cliente.objects.all()
+    orden = request.GET.get("orden", "nombre")
+    if orden not in ORDENES_CLIENTES:
+        orden = "nombre"
+    clientes = Cliente.objects.vigentes()
     if q:
         clientes = clientes.filter(
             Q(nombre__icontains=q) | Q(telefono__icontains=q) | Q(email__icontains=q)
         )
-    return render(request, "citas/cliente_lista.html", {"clientes": clientes, "q": q})
+    if request.GET.get("con_inasistencias"):
+        clientes = clientes.filter(citas_no_asistidas__gt=0)
+    clientes = clientes.order_by(*ORDENES_CLIENTES[orden])
+    return render(
+        request,
+        "citas/cliente_lista.html",
+        {
+            "clientes": clientes,
+            "q": q,
+            "orden": orden,
+            "con_inasistencias": bool(request.GET.get("con_inasistencias")),
+        },
+    )
+
+
+# Segundos que se cachean las sugerencias del autocompletado
+BUSQUEDA_CACHE_TTL = 30
+
+
+@login_required
+def cliente_buscar(request):
+    """Sugerencias JSON para el autocompletado de clientes."""
+    q = request.GET.get("q", "").strip()[:50]
+    solo_activos = bool(request.GET.get("activos"))
+    if len(q) < 2:
+        return JsonResponse({"resultados": []})
+
+    clave = f"clientes:buscar:{int(solo_activos)}:{quote(q.lower())}"
+    resultados = cache.get(clave)
+    if resultados is None:
+        clientes = Cliente.objects.vigentes()
+        if solo_activos:
+            clientes = clientes.filter(activo=True)
+        resultados = list(clientes.buscar(q).values("id", "nombre", "telefono"))
+        cache.set(clave, resultados, BUSQUEDA_CACHE_TTL)
+    return JsonResponse({"resultados": resultados})
 
 
 @login_required
@@ -72,7 +168,7 @@ def cliente_crear(request):
 @login_required
 def cliente_editar(request, pk):
     """Editar un cliente existente."""
-    cliente = get_object_or_404(Cliente, pk=pk)
+    cliente = get_object_or_404(Cliente.objects.vigentes(), pk=pk)
     if request.method == "POST":
         form = ClienteForm(request.POST, instance=cliente)
         if form.is_valid():
@@ -88,8 +184,8 @@ def cliente_editar(request, pk):
 
 @login_required
 def cliente_eliminar(request, pk):
-    """Eliminar un cliente."""
-    cliente = get_object_or_404(Cliente, pk=pk)
+    """Eliminar un cliente (borrado lógico; la purga física es por comando)."""
+    cliente = get_object_or_404(Cliente.objects.vigentes(), pk=pk)
     
     # Verificar si tiene citas futuras
     hoy = timezone.now().date()
@@ -107,16 +203,103 @@ def cliente_eliminar(request, pk):
     
     if request.method == "POST":
         nombre = cliente.nombre
-        cliente.delete()
+        Cliente.objects.filter(pk=cliente.pk).marcar_eliminados()
         messages.success(request, f"Cliente {nombre} eliminado exitosamente.")
         return redirect("cliente_lista")
     return render(request, "citas/cliente_confirmar_eliminar.html", {"cliente": cliente})
 
 
 @login_required
+def cliente_acciones(request):
+    """Desactivar o eliminar varios clientes seleccionados en la lista."""
+    if request.method != "POST":
+        return redirect("cliente_lista")
+
+    accion = request.POST.get("accion")
+    seleccion = [pk for pk in request.POST.getlist("seleccion") if pk.isdigit()]
+    clientes = Cliente.objects.vigentes().filter(pk__in=seleccion)
+    if not seleccion or accion not in ("desactivar", "eliminar"):
+        messages.error(request, "Selecciona al menos un cliente y una acción.")
+        return redirect("cliente_lista")
+
+    if accion == "desactivar":
+        total = clientes.desactivar()
+        messages.success(request, f"{total} cliente(s) desactivado(s).")
+        return redirect("cliente_lista")
+
+    # Mismo criterio que cliente_eliminar: no se eliminan clientes con citas futuras
+    con_citas_futuras = clientes.con_citas_futuras()
+    bloqueados = con_citas_futuras.count()
+    total = clientes.exclude(pk__in=con_citas_futuras).marcar_eliminados()
+    messages.success(request, f"{total} cliente(s) eliminado(s).")
+    if bloqueados:
+        messages.warning(
+            request,
+            f"{bloqueados} cliente(s) no se eliminaron porque tienen citas futuras.",
+        )
+    return redirect("cliente_lista")
+
+
+# Pares mostrados por página de revisión
+DUPLICADOS_POR_PAGINA = 100
+
+
+@login_required
+def duplicado_lista(request):
+    """Posibles clientes duplicados pendientes de revisión, con mayor similitud primero."""
+    pendientes = PosibleDuplicado.objects.filter(estado="pendiente")
+    context = {
+        "pares": pendientes.select_related("cliente", "duplicado")[:DUPLICADOS_POR_PAGINA],
+        "total": pendientes.count(),
+    }
+    return render(request, "citas/duplicado_lista.html", context)
+
+
+@login_required
+def duplicado_accion(request, pk):
+    """Fusionar un par (conservando el cliente elegido) o descartarlo."""
+    par = get_object_or_404(
+        PosibleDuplicado.objects.select_related("cliente", "duplicado"),
+        pk=pk,
+        estado="pendiente",
+    )
+    if request.method != "POST":
+        return redirect("duplicado_lista")
+
+    accion = request.POST.get("accion")
+    if accion == "descartar":
+        PosibleDuplicado.objects.filter(pk=par.pk).update(
+            estado="descartado", revisado=timezone.now()
+        )
+        messages.info(request, "Par descartado; no se volverá a proponer.")
+    elif accion == "fusionar":
+        if request.POST.get("conservar") == str(par.duplicado_id):
+            conservar, desactivar = par.duplicado, par.cliente
+        else:
+            conservar, desactivar = par.cliente, par.duplicado
+        movidas = duplicados.fusionar(conservar, desactivar)
+        messages.success(
+            request,
+            f"{desactivar} se fusionó en {conservar}: {movidas} cita(s) movida(s).",
+        )
+    else:
+        messages.error(request, "Acción no válida.")
+    return redirect("duplicado_lista")
+
+
+def _sondeo_cliente_detalle(request, pk):
+    return (
+        version("contadores"),
+        *sondeo(Cliente.objects.filter(pk=pk)),
+        *sondeo(Cita.objects.filter(cliente_id=pk)),
+    )
+
+
+@login_required
+@etag_condicional(_sondeo_cliente_detalle)
 def cliente_detalle(request, pk):
     """Ver detalle de un cliente con su historial de citas."""
-    cliente = get_object_or_404(Cliente, pk=pk)
+    cliente = get_object_or_404(Cliente.objects.vigentes(), pk=pk)
     citas = cliente.citas.all().order_by("-fecha", "-hora")
     return render(request, "citas/cliente_detalle.html", {"cliente": cliente, "citas": citas})
 
@@ -124,14 +307,68 @@ def cliente_detalle(request, pk):
 # ─── CRUD Citas ─────────────────────────────────────────────────────────────────
 
 
+def _sondeo_cita_lista(request):
+    citas = Cita.objects.all()
+    if request.GET.get("estado"):
+        citas = citas.filter(estado=request.GET["estado"])
+    # La lista muestra el nombre de cada cliente
+    return (version("riesgo"), *sondeo(citas), *sondeo(Cliente.objects.all()))
+
+
 @login_required
+@etag_condicional(_sondeo_cita_lista)
 def cita_lista(request):
     """Lista de todas las citas."""
     estado = request.GET.get("estado", "")
+    orden = request.GET.get("orden", "")
     citas = Cita.objects.select_related("cliente").all()
     if estado:
         citas = citas.filter(estado=estado)
-    return render(request, "citas/cita_lista.html", {"citas": citas, "estado_filtro": estado})
+    if orden == "riesgo":
+        citas = citas.order_by(ORDEN_RIESGO, "fecha", "hora")
+    return render(
+        request,
+        "citas/cita_lista.html",
+        {"citas": citas, "estado_filtro": estado, "orden": orden},
+    )
+
+
+@login_required
+def cita_acciones(request):
+    """Cancelar, mover o eliminar varias citas seleccionadas en la lista."""
+    if request.method != "POST":
+        return redirect("cita_lista")
+
+    # Volver a la lista con el mismo filtro
+    filtro = {k: request.POST[k] for k in ("estado", "orden") if request.POST.get(k)}
+    destino = reverse("cita_lista") + (f"?{urlencode(filtro)}" if filtro else "")
+
+    form = AccionCitasForm(request.POST)
+    if not form.is_valid():
+        for errores in form.errors.values():
+            for error in errores:
+                messages.error(request, error)
+        return redirect(destino)
+
+    citas = form.cleaned_data["seleccion"]
+    accion = form.cleaned_data["accion"]
+    try:
+        if accion == "cancelar":
+            total = citas.cambiar_estado("cancelada")
+            messages.success(request, f"{total} cita(s) cancelada(s).")
+        elif accion == "desplazar":
+            total = citas.desplazar(form.cleaned_data["delta"])
+            messages.success(request, f"{total} cita(s) movida(s).")
+        else:
+            total = citas.eliminar()
+            messages.success(request, f"{total} cita(s) eliminada(s).")
+    except FranjaLlena as error:
+        # Otra recepción ocupó los últimos lugares después de validar
+        for mensaje in error.messages:
+            messages.error(request, mensaje)
+    else:
+        invalidar_resumen()
+    return redirect(destino)
 
 
 @login_required
@@ -140,10 +377,15 @@ def cita_crear(request):
     if request.method == "POST":
         form = CitaForm(request.POST)
         if form.is_valid():
-            cita = form.save()
-            messages.success(request, "Cita creada exitosamente.")
-            # Redirigir a la página de envío de WhatsApp
-            return redirect("cita_whatsapp", pk=cita.pk)
+            try:
+                cita = form.save()
+            except FranjaLlena as error:
+                # Otra recepción ocupó el último lugar después de validar
+                form.add_error(None, error)
+            else:
+                messages.success(request, "Cita creada exitosamente.")
+                # Redirigir a la página de envío de WhatsApp
+                return redirect("cita_whatsapp", pk=cita.pk)
     else:
         form = CitaForm()
         # Pre-seleccionar cliente si viene por parámetro
@@ -160,9 +402,13 @@ def cita_editar(request, pk):
     if request.method == "POST":
         form = CitaForm(request.POST, instance=cita)
         if form.is_valid():
-            form.save()
-            messages.success(request, "Cita actualizada exitosamente.")
-            return redirect("cita_lista")
+            try:
+                form.save()
+            except FranjaLlena as error:
+                form.add_error(None, error)
+            else:
+                messages.success(request, "Cita actualizada exitosamente.")
+                return redirect("cita_lista")
     else:
         form = CitaForm(instance=cita)
     return render(request, "citas/cita_form.html", {"form": form, "titulo": "Editar Cita", "cita": cita})
@@ -191,20 +437,88 @@ def cita_eliminar(request, pk):
     return render(request, "citas/cita_confirmar_eliminar.html", {"cita": cita})
 
 
+def _sondeo_cita_detalle(request, pk):
+    return (*sondeo(Cita.objects.filter(pk=pk)), *sondeo(Cliente.objects.filter(citas=pk)))
+
+
 @login_required
+@etag_condicional(_sondeo_cita_detalle)
 def cita_detalle(request, pk):
     """Ver detalle de una cita."""
     cita = get_object_or_404(Cita, pk=pk)
     return render(request, "citas/cita_detalle.html", {"cita": cita})
 
 
-# ─── WhatsApp y Confirmación ────────────────────────────────────────────────────
+@login_required
+def serie_crear(request):
+    """Crear una serie de citas recurrentes."""
+    if request.method == "POST":
+        form = SerieCitaForm(request.POST)
+        if form.is_valid():
+            try:
+                citas = series.crear_serie(form.save(commit=False), form.fechas)
+            except FranjaLlena as error:
+                form.add_error(None, error)
+            else:
+                messages.success(request, f"Serie creada con {len(citas)} citas.")
+                return redirect("cliente_detalle", pk=form.instance.cliente_id)
+    else:
+        form = SerieCitaForm(initial={"unidad": "semanas", "intervalo": 1})
+        cliente_id = request.GET.get("cliente")
+        if cliente_id:
+            form.fields["cliente"].initial = cliente_id
+    return render(request, "citas/cita_form.html", {"form": form, "titulo": "Nueva Serie de Citas"})
 
 
 @login_required
-def cita_whatsapp(request, pk):
+def cita_serie_editar(request, pk):
+    """Cambiar hora, motivo o notas de esta cita y las siguientes de su serie."""
+    cita = get_object_or_404(Cita, pk=pk, serie__isnull=False)
+    citas = series.siguientes(cita)
+    if request.method == "POST":
+        form = SerieEdicionForm(request.POST, citas=citas, cliente=cita.cliente)
+        if form.is_valid():
+            try:
+                total = series.actualizar_siguientes(cita, **form.cleaned_data)
+            except FranjaLlena as error:
+                form.add_error(None, error)
+            else:
+                messages.success(request, f"{total} cita(s) de la serie actualizada(s).")
+                return redirect("cita_detalle", pk=cita.pk)
+    else:
+        form = SerieEdicionForm(initial={"hora": cita.hora, "motivo": cita.motivo, "notas": cita.notas})
+    return render(
+        request,
+        "citas/cita_form.html",
+        {"form": form, "titulo": "Editar esta cita y las siguientes", "cita": cita},
+    )
+
+
+@login_required
+def cita_serie_cancelar(request, pk):
+    """Cancelar esta cita y las siguientes de su serie."""
+    cita = get_object_or_404(Cita, pk=pk, serie__isnull=False)
+    if request.method == "POST":
+        total = series.cancelar_siguientes(cita)
+        messages.success(request, f"{total} cita(s) de la serie cancelada(s).")
+    return redirect("cita_detalle", pk=cita.pk)
+
+
+# ─── WhatsApp y Confirmación ────────────────────────────────────────────────────
+
+
+async def _aobtener_cita(**filtros):
+    """get_object_or_404 con el ORM async; incluye al cliente en la misma consulta."""
+    try:
+        return await Cita.objects.select_related("cliente").aget(**filtros)
+    except Cita.DoesNotExist:
+        raise Http404("No existe la cita solicitada.")
+
+
+@login_required_async
+async def cita_whatsapp(request, pk):
     """Página para enviar notificación por WhatsApp."""
-    cita = get_object_or_404(Cita, pk=pk)
+    cita = await _aobtener_cita(pk=pk)
     # Construir base_url dinámicamente
     base_url = request.build_absolute_uri("/").rstrip("/")
     url_whatsapp = cita.generar_url_whatsapp(base_url)
@@ -216,10 +530,35 @@ def cita_whatsapp(request, pk):
     )
 
 
-def cita_confirmar(request, token):
-    """Vista pública para que el cliente confirme su cita."""
-    cita = get_object_or_404(Cita, token_confirmacion=token)
+async def cita_confirmar(request, token):
+    """Vista pública para que el cliente confirme su cita (enlaces UUID anteriores)."""
+    cita = await _aobtener_cita(token_confirmacion=token)
+    return await _procesar_confirmacion(request, cita)
+
+
+async def cita_confirmar_corto(request, token):
+    """
+    Vista pública con enlace corto: busca la cita por pk y verifica la firma
+    en memoria.
+    """
+    try:
+        pk, vence, firma = enlaces.leer_token(token)
+    except enlaces.TokenInvalido:
+        raise Http404("Enlace de confirmación inválido.")
+    cita = await _aobtener_cita(pk=pk)
+    if not enlaces.firma_valida(cita, vence, firma):
+        raise Http404("Enlace de confirmación inválido.")
+    if enlaces.vencido(vence):
+        return render(request, "citas/confirmacion_resultado.html", {
+            "cita": cita,
+            "mensaje": "Este enlace de confirmación ya venció.",
+            "tipo": "warning",
+        })
+    return await _procesar_confirmacion(request, cita)
+
 
+async def _procesar_confirmacion(request, cita):
+    """Confirmación o cancelación pública de `cita`."""
     # Verificar si la cita ya fue cancelada o completada
     if cita.estado in ["cancelada", "completada", "no_asistio"]:
         return render(request, "citas/confirmacion_resultado.html", {
@@ -245,7 +584,7 @@ def cita_confirmar(request, token):
                     "tipo": "info",
                 })
             cita.estado = "confirmada"
-            cita.save()
+            await cita.asave()
             return render(request, "citas/confirmacion_resultado.html", {
                 "cita": cita,
                 "mensaje": "¡Su cita ha sido confirmada exitosamente!",
@@ -253,7 +592,7 @@ def cita_confirmar(request, token):
             })
         elif accion == "cancelar":
             cita.estado = "cancelada"
-            cita.save()
+            await cita.asave()
             return render(request, "citas/confirmacion_resultado.html", {
                 "cita": cita,
                 "mensaje": "Su cita ha sido cancelada. Gracias por avisarnos.",
@@ -305,6 +644,7 @@ def registrar_asistencia(request, pk):
 
 
 @login_required
+@lectura_replica
 def reporte_asistencia(request):
     """Reporte de asistencia con filtros."""
     form = ReporteForm(request.GET or None)
@@ -356,3 +696,87 @@ def reporte_asistencia(request):
         "porcentaje_asistencia": round((asistieron / total * 100), 1) if total > 0 else 0,
     }
     return render(request, "citas/reporte_asistencia.html", context)
+
+
+def _ocupacion_filtrada(request):
+    """Valida los filtros y devuelve (form, franjas); franjas es None si hay errores."""
+    form = OcupacionForm(request.GET)
+    if not form.is_valid():
+        return form, None
+    datos = form.cleaned_data
+    return form, ocupacion(datos["fecha_inicio"], datos["fecha_fin"], datos["estado"])
+
+
+@login_required
+@lectura_replica
+def reporte_ocupacion(request):
+    """Mapa de calor de citas por día de la semana y hora."""
+    form, franjas = _ocupacion_filtrada(request)
+    horas = range(CitaForm.HORA_INICIO.hour, CitaForm.HORA_FIN.hour)
+    context = {"form": form, "horas": horas}
+    if franjas is not None:
+        context.update({
+            "filas": matriz_ocupacion(franjas, horas, form.cleaned_data["metrica"]),
+            "metrica": form.cleaned_data["metrica"],
+            "total": sum(f["total"] for f in franjas),
+        })
+    return render(request, "citas/reporte_ocupacion.html", context)
+
+
+@login_required
+@lectura_replica
+def reporte_ocupacion_json(request):
+    """Las mismas franjas de ocupación en JSON."""
+    form, franjas = _ocupacion_filtrada(request)
+    if franjas is None:
+        return JsonResponse({"errores": form.errors}, status=400)
+    datos = form.cleaned_data
+    return JsonResponse({
+        "fecha_inicio": datos["fecha_inicio"],
+        "fecha_fin": datos["fecha_fin"],
+        "estado": datos["estado"],
+        "franjas": franjas,
+    })
+
+
+# ─── Tareas en segundo plano ────────────────────────────────────────────────────
+
+
+@login_required
+def tarea_lista(request):
+    """Tareas recientes y formulario para encolar tareas de mantenimiento."""
+    if request.method == "POST":
+        nombre = request.POST.get("nombre")
+        if not request.user.is_staff:
+            messages.error(request, "Solo el personal administrativo puede encolar tareas.")
+        elif nombre not in tareas.REGISTRO:
+            messages.error(request, "Tarea desconocida.")
+        else:
+            tarea = tareas.encolar(nombre, usuario=request.user)
+            messages.success(request, f"Tarea #{tarea.pk} encolada.")
+        return redirect("tarea_lista")
+
+    context = {
+        "tareas": Tarea.objects.select_related("usuario")[:50],
+        "disponibles": [
+            (nombre, funcion.descripcion) for nombre, funcion in tareas.REGISTRO.items()
+        ],
+    }
+    return render(request, "citas/tarea_lista.html", context)
+
+
+@login_required
+def tarea_estado(request, pk):
+    """Estado de una tarea en JSON, para consultas periódicas desde la página."""
+    tarea = get_object_or_404(Tarea, pk=pk)
+    return JsonResponse({
+        "id": tarea.pk,
+        "nombre": tarea.nombre,
+        "estado": tarea.estado,
+        "estado_display": tarea.get_estado_display(),
+        "progreso": tarea.progreso,
+        "mensaje": tarea.mensaje,
+        "resultado": tarea.resultado,
+        "terminada": tarea.estado in ("completada", "fallida"),
+    })
+
@@ -0,0 +1,33 @@
+from django import forms
+from django.urls import reverse
+
+from .models import Cliente
+
+
+class ClienteAutocompleteWidget(forms.Widget):
+    """
+    Selector de cliente con búsqueda incremental.
+
+    A diferencia de `forms.Select`, no recorre `choices`: solo consulta el
+    cliente seleccionado (por pk) para mostrar su nombre. Las sugerencias se
+    piden al endpoint `cliente_buscar` mientras se escribe.
+    """
+
+    template_name = "citas/widgets/cliente_autocomplete.html"
+
+    def __init__(self, attrs=None, solo_activos=False):
+        super().__init__(attrs)
+        self.solo_activos = solo_activos
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        etiqueta = ""
+        if value is not None and str(value).isdigit():
+            cliente = Cliente.objects.filter(pk=value).only("nombre", "telefono").first()
+            if cliente:
+                etiqueta = str(cliente)
+        url = reverse("cliente_buscar")
+        if self.solo_activos:
+            url += "?activos=1"
+        context["widget"].update({"url": url, "etiqueta": etiqueta})
+        return context
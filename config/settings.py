@@ -10,7 +10,7 @@ SECRET_KEY = "django-insecure-cambia-esta-clave-en-produccion-abc123xyz"
 
 DEBUG = False
 
-ALLOWED_HOSTS = ["luisss22.pythonanywhere.com"]
+ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "luisss22.pythonanywhere.com").split(",")
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -19,6 +19,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.forms",
     "citas",
 ]
 
@@ -29,6 +30,7 @@ MIDDLEWARE = [
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "citas.replica.ReplicaMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
@@ -50,8 +52,14 @@ TEMPLATES = [
     },
 ]
 
+# Permite que los widgets usen plantillas de templates/ (p. ej. el autocompletado)
+FORM_RENDERER = "django.forms.renderers.TemplatesSetting"
+
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Precompila plantillas y llena cachés al iniciar (gunicorn.conf.py lo activa)
+CALENTAR_AL_INICIAR = os.environ.get("WARMUP_ON_START", "0") == "1"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
@@ -59,6 +67,26 @@ DATABASES = {
     }
 }
 
+# Réplica de solo lectura para reportes y exportaciones (ver citas/replica.py).
+# DB_REPLICA=snapshot usa una copia local de SQLite abierta en modo solo
+# lectura, actualizada con `python manage.py snapshot_replica --intervalo 300`.
+# Con PostgreSQL/MySQL basta con agregar aquí un alias "replica".
+REPLICA_STICKY_SECONDS = 60
+if os.environ.get("DB_REPLICA") == "snapshot":
+    REPLICA_SNAPSHOT_PATH = BASE_DIR / "db_replica.sqlite3"
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{REPLICA_SNAPSHOT_PATH}?mode=ro",
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["citas.replica.ReplicaRouter"]
+
+# Agenda: citas simultáneas permitidas por franja (consultorios o doctores
+# disponibles). Se puede ajustar por franja desde el admin.
+CAPACIDAD_FRANJA = int(os.environ.get("CAPACIDAD_FRANJA", "1"))
+MINUTOS_POR_FRANJA = 30
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -93,6 +121,34 @@ SECURE_BROWSER_XSS_FILTER = True
 X_FRAME_OPTIONS = "DENY"
 SECURE_CONTENT_TYPE_NOSNIFF = True
 
+# Caché compartida entre workers (archivos locales, sin servicios externos).
+# Se puede cambiar por variables de entorno, p. ej. a Redis o Memcached.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", str(BASE_DIR / "cache")),
+    }
+}
+
+# Estrategia de sesión: "cached_db" (caché + respaldo en BD), "signed_cookies"
+# (sin tabla de sesiones) o "db" (comportamiento original de Django)
+SESSION_STRATEGY = os.environ.get("SESSION_STRATEGY", "cached_db")
+SESSION_ENGINE = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}[SESSION_STRATEGY]
+
+# Usuarios autenticados cacheados por sesión (ver citas/autenticacion.py).
+# ModelBackend se conserva para las sesiones iniciadas antes del cambio.
+AUTHENTICATION_BACKENDS = [
+    "citas.autenticacion.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+AUTH_USER_CACHE_TIMEOUT = 300  # 5 minutos
+
 # Configuraciones de sesión
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SECURE = True
@@ -102,3 +158,18 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 # CSRF
 CSRF_COOKIE_HTTPONLY = False  # Necesario para JavaScript
 CSRF_COOKIE_SECURE = True
+
+# Logs de la app (resumen de aciertos del GET condicional, tareas, arranque)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "consola": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "citas": {
+            "handlers": ["consola"],
+            "level": os.environ.get("CITAS_LOG_LEVEL", "INFO"),
+        },
+    },
+}
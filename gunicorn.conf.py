@@ -0,0 +1,33 @@
+"""
+Configuración de gunicorn.
+
+PRELOAD_APP (por defecto "1") carga Django una sola vez en el proceso
+maestro; los workers nuevos (también los reciclados) se crean con fork y
+heredan las plantillas compiladas, las URLs resueltas y la caché caliente
+(ver citas/arranque.py).
+
+SERVER_MODE elige el tipo de worker:
+- "wsgi" (por defecto): workers síncronos sobre config.wsgi
+- "asgi": workers uvicorn sobre config.asgi; una conexión lenta ya no
+  ocupa un worker completo y las vistas async no bloquean el proceso
+"""
+import os
+
+# Activa el calentamiento en CitasConfig.ready()
+os.environ.setdefault("WARMUP_ON_START", "1")
+
+preload_app = os.environ.get("PRELOAD_APP", "1") == "1"
+
+modo = os.environ.get("SERVER_MODE", "wsgi")
+
+if modo == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "sync"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+accesslog = "-"
+errorlog = "-"